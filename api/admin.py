@@ -1,12 +1,57 @@
 from django.contrib import admin
 
-from api.models import Review
+from api.models import AuthToken, CompanyRating, Review, ReviewBody
+from api.pagination import EstimatedCountPaginator
+from api.search import search_reviews
+
+
+class ReviewBodyInline(admin.StackedInline):
+    model = ReviewBody
+    can_delete = False
 
 
 class ReviewAdmin(admin.ModelAdmin):
-    list_display = ('title', 'rating', 'company', 'reviewer')
+    list_display = ('title', 'rating', 'company', 'reviewer', 'created_at')
     list_filter = ('rating',)
     search_fields = ['title', 'company', 'reviewer']
+    date_hierarchy = 'created_at'
+    ordering = ('-created_at', '-id')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    actions = ['delete_reviews']
+    inlines = [ReviewBodyInline]
+
+    def get_search_results(self, request, queryset, search_term):
+        return search_reviews(queryset, search_term), False
+
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        actions.pop('delete_selected', None)
+        return actions
+
+    def delete_reviews(self, request, queryset):
+        deleted = Review.objects.bulk_delete(queryset)
+        self.message_user(request, 'Deleted {} review(s).'.format(deleted))
+    delete_reviews.allowed_permissions = ('delete',)
+    delete_reviews.short_description = 'Delete selected reviews'
+
+
+class AuthTokenAdmin(admin.ModelAdmin):
+    list_display = ('user', 'created_at', 'expires_at')
+    exclude = ('key_digest',)
+
+    def has_add_permission(self, request):
+        return False
+
+
+class CompanyRatingAdmin(admin.ModelAdmin):
+    list_display = ('company', 'review_count', 'average_rating')
+    search_fields = ['company']
+
+    def has_add_permission(self, request):
+        return False
 
 
 admin.site.register(Review, ReviewAdmin)
+admin.site.register(AuthToken, AuthTokenAdmin)
+admin.site.register(CompanyRating, CompanyRatingAdmin)
@@ -0,0 +1,102 @@
+from datetime import datetime
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from api.models import ArchivedReview, CompanyRating, Review, ReviewTombstone, UserReviewStats
+
+ARCHIVE_TABLE = 'api_archivedreview'
+PARTITION_NAME = ARCHIVE_TABLE + '_y{:04d}m{:02d}'
+ARCHIVED_FIELDS = ('id', 'title', 'summary', 'rating', 'ip_address', 'company', 'reviewer', 'user_id', 'created_at')
+
+
+def is_partitioned():
+    return connection.vendor == 'postgresql'
+
+
+def month_start(value):
+    return datetime(value.year, value.month, 1, tzinfo=timezone.utc)
+
+
+def add_months(value, months):
+    month = value.month - 1 + months
+    return value.replace(year=value.year + month // 12, month=month % 12 + 1, day=1)
+
+
+def ensure_partition(month):
+    start = month_start(month)
+    name = PARTITION_NAME.format(start.year, start.month)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'CREATE TABLE IF NOT EXISTS {} PARTITION OF {} FOR VALUES FROM (%s) TO (%s)'.format(
+                connection.ops.quote_name(name), ARCHIVE_TABLE
+            ),
+            [start.isoformat(), add_months(start, 1).isoformat()]
+        )
+    return name
+
+
+def ensure_partitions(start, end):
+    if not is_partitioned():
+        return []
+    names = []
+    month = month_start(start)
+    while month <= end:
+        names.append(ensure_partition(month))
+        month = add_months(month, 1)
+    return names
+
+
+def list_partitions():
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT child.relname FROM pg_inherits '
+            'JOIN pg_class parent ON pg_inherits.inhparent = parent.oid '
+            'JOIN pg_class child ON pg_inherits.inhrelid = child.oid '
+            'WHERE parent.relname = %s ORDER BY child.relname',
+            [ARCHIVE_TABLE]
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def detach_partitions(before, drop=False):
+    if not is_partitioned():
+        return []
+    detached = []
+    for name in list_partitions():
+        year, month = int(name[-7:-3]), int(name[-2:])
+        if add_months(datetime(year, month, 1, tzinfo=timezone.utc), 1) > before:
+            continue
+        with connection.cursor() as cursor:
+            quoted = connection.ops.quote_name(name)
+            cursor.execute('ALTER TABLE {} DETACH PARTITION {}'.format(ARCHIVE_TABLE, quoted))
+            if drop:
+                cursor.execute('DROP TABLE {}'.format(quoted))
+        detached.append(name)
+    return detached
+
+
+def archive_reviews(cutoff, batch_size):
+    total = 0
+    while True:
+        with transaction.atomic():
+            reviews = list(
+                Review.objects.select_related('body').select_for_update(of=('self',))
+                .filter(created_at__lt=cutoff)
+                .order_by('id')[:batch_size]
+            )
+            if not reviews:
+                return total
+
+            months = [review.created_at for review in reviews]
+            ensure_partitions(min(months), max(months))
+            ArchivedReview.objects.bulk_create([
+                ArchivedReview(**{field: getattr(review, field) for field in ARCHIVED_FIELDS})
+                for review in reviews
+            ])
+            ids = [review.id for review in reviews]
+            Review.objects.filter(id__in=ids).delete()
+            ReviewTombstone.objects.filter(review_id__in=ids).delete()
+            CompanyRating.objects.add_reviews(reviews)
+            UserReviewStats.objects.add_reviews(reviews)
+        total += len(reviews)
@@ -0,0 +1,69 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+
+from api.models import AuthToken
+
+
+class VerifiedTokenCache:
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, digest):
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._entries[digest]
+                return None
+            self._entries.move_to_end(digest)
+            return entry[1]
+
+    def set(self, digest, token):
+        with self._lock:
+            self._entries[digest] = (time.monotonic() + settings.REVIEWS_TOKEN_CACHE_TTL, token)
+            self._entries.move_to_end(digest)
+            while len(self._entries) > settings.REVIEWS_TOKEN_CACHE_SIZE:
+                self._entries.popitem(last=False)
+
+    def discard(self, digest):
+        with self._lock:
+            self._entries.pop(digest, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+token_cache = VerifiedTokenCache()
+
+
+class ExpiringTokenAuthentication(TokenAuthentication):
+    model = AuthToken
+
+    def authenticate_credentials(self, key):
+        digest = AuthToken.digest(key)
+        token = token_cache.get(digest)
+        cached = token is not None
+        if not cached:
+            try:
+                token = AuthToken.objects.select_related('user').get(key_digest=digest)
+            except AuthToken.DoesNotExist:
+                raise exceptions.AuthenticationFailed('Invalid token.')
+
+        if token.is_expired():
+            token_cache.discard(digest)
+            raise exceptions.AuthenticationFailed('Token has expired.')
+        if not token.user.is_active:
+            token_cache.discard(digest)
+            raise exceptions.AuthenticationFailed('User inactive or deleted.')
+
+        if not cached:
+            token_cache.set(digest, token)
+        return (token.user, token)
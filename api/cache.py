@@ -0,0 +1,38 @@
+import hashlib
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+LIST_VERSION_KEY = 'api:reviews:version:{}'
+LIST_PAGE_KEY = 'api:reviews:page:{}:{}'
+
+
+def bump_list_version(user_id):
+    version = '{}.{}'.format(int(time.time() * 1000000), uuid.uuid4().hex[:8])
+    cache.set(LIST_VERSION_KEY.format(user_id), version, None)
+    return version
+
+
+def get_list_version(user_id):
+    version = cache.get(LIST_VERSION_KEY.format(user_id))
+    if version is None:
+        version = bump_list_version(user_id)
+    return version
+
+
+def list_version_timestamp(version):
+    return int(version.split('.')[0]) // 1000000
+
+
+def list_etag(version, uri, media_type=''):
+    return hashlib.md5('{}|{}|{}'.format(version, uri, media_type).encode('utf-8')).hexdigest()
+
+
+def get_list_page(user_id, etag):
+    return cache.get(LIST_PAGE_KEY.format(user_id, etag))
+
+
+def set_list_page(user_id, etag, data):
+    cache.set(LIST_PAGE_KEY.format(user_id, etag), data, settings.REVIEWS_LIST_CACHE_TIMEOUT)
@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.core.checks import Error, register
+
+LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+@register()
+def check_replica_cache(app_configs, **kwargs):
+    backend = settings.CACHES.get('default', {}).get('BACKEND')
+    if settings.REVIEWS_READ_REPLICAS and backend in LOCAL_CACHES:
+        return [Error(
+            'REVIEWS_READ_REPLICAS needs a cache shared by all workers.',
+            hint='Configure a shared CACHES backend such as Memcached or Redis.',
+            obj='REVIEWS_READ_REPLICAS',
+            id='api.E001',
+        )]
+    return []
@@ -0,0 +1,14 @@
+import django_filters
+
+from api.models import Review
+
+
+class ReviewFilter(django_filters.FilterSet):
+    rating_min = django_filters.NumberFilter(field_name='rating', lookup_expr='gte')
+    rating_max = django_filters.NumberFilter(field_name='rating', lookup_expr='lte')
+    created_after = django_filters.IsoDateTimeFilter(field_name='created_at', lookup_expr='gte')
+    created_before = django_filters.IsoDateTimeFilter(field_name='created_at', lookup_expr='lt')
+
+    class Meta:
+        model = Review
+        fields = ('company', 'reviewer')
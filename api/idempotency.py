@@ -0,0 +1,95 @@
+import hashlib
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+
+from api.models import IdempotencyKey
+
+MAX_KEY_LENGTH = 255
+
+
+def fingerprint(data):
+    content = json.dumps(data, sort_keys=True, cls=JSONEncoder)
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+def _expiry(now):
+    return now + timedelta(seconds=settings.REVIEWS_IDEMPOTENCY_TTL)
+
+
+def begin(user, key, request_fingerprint):
+    if len(key) > MAX_KEY_LENGTH:
+        return None, Response(
+            {'detail': 'Idempotency-Key may not be longer than {} characters.'.format(MAX_KEY_LENGTH)},
+            status.HTTP_400_BAD_REQUEST
+        )
+
+    now = timezone.now()
+    record = IdempotencyKey.objects.filter(user=user, key=key).first()
+    if record is None:
+        try:
+            with transaction.atomic():
+                record = IdempotencyKey.objects.create(
+                    user=user,
+                    key=key,
+                    fingerprint=request_fingerprint,
+                    created_at=now,
+                    expires_at=_expiry(now)
+                )
+            return record, None
+        except IntegrityError:
+            record = IdempotencyKey.objects.get(user=user, key=key)
+
+    lock_expired = now - timedelta(seconds=settings.REVIEWS_IDEMPOTENCY_LOCK_TIMEOUT)
+    abandoned = record.status == IdempotencyKey.IN_FLIGHT and record.created_at <= lock_expired
+    if record.expires_at <= now or abandoned:
+        claimed = IdempotencyKey.objects.filter(pk=record.pk, created_at=record.created_at).update(
+            fingerprint=request_fingerprint,
+            status=IdempotencyKey.IN_FLIGHT,
+            response_status=None,
+            response_body='',
+            created_at=now,
+            expires_at=_expiry(now)
+        )
+        if claimed:
+            record.refresh_from_db()
+            return record, None
+        return None, _in_flight()
+
+    if record.fingerprint != request_fingerprint:
+        return None, Response(
+            {'detail': 'Idempotency-Key was already used with a different request.'},
+            status.HTTP_422_UNPROCESSABLE_ENTITY
+        )
+    if record.status == IdempotencyKey.IN_FLIGHT:
+        return None, _in_flight()
+    return None, Response(
+        json.loads(record.response_body),
+        record.response_status,
+        headers={'Idempotent-Replayed': 'true'}
+    )
+
+
+def finish(record, response):
+    record.status = IdempotencyKey.DONE
+    record.response_status = response.status_code
+    record.response_body = json.dumps(response.data, cls=JSONEncoder)
+    record.save(update_fields=['status', 'response_status', 'response_body'])
+
+
+def abort(record):
+    record.delete()
+
+
+def _in_flight():
+    return Response(
+        {'detail': 'A request with this Idempotency-Key is still being processed.'},
+        status.HTTP_409_CONFLICT,
+        headers={'Retry-After': '1'}
+    )
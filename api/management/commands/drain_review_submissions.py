@@ -0,0 +1,28 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api.models import ReviewSubmission
+
+
+class Command(BaseCommand):
+    help = 'Writes queued review submissions to the reviews table in batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=settings.REVIEWS_INGESTION_BATCH_SIZE)
+        parser.add_argument('--loop', action='store_true', help='Keep polling for new submissions.')
+        parser.add_argument('--interval', type=float, default=1.0, help='Seconds to sleep when idle.')
+
+    def handle(self, *args, **options):
+        total = 0
+        while True:
+            count = ReviewSubmission.objects.drain(options['batch_size'])
+            total += count
+            if count:
+                self.stdout.write('Wrote {} reviews.'.format(count))
+            elif options['loop']:
+                time.sleep(options['interval'])
+            else:
+                break
+        self.stdout.write(self.style.SUCCESS('Drained {} submissions.'.format(total)))
@@ -0,0 +1,146 @@
+import csv
+import gzip
+import json
+import multiprocessing
+import os
+import time
+from datetime import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.models import Max, Min
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from api.models import Review
+
+FIELDS = ('id', 'user__username', 'title', 'body__summary', 'rating', 'company', 'reviewer', 'created_at')
+COLUMNS = ('id', 'user', 'title', 'summary', 'rating', 'company', 'reviewer', 'created_at')
+
+
+def export_range(path, fmt, filters, id_range, chunk_size):
+    queryset = Review.objects.filter(**filters)
+    if id_range is not None:
+        queryset = queryset.filter(id__gte=id_range[0], id__lt=id_range[1])
+    rows = queryset.order_by('id').values_list(*FIELDS).iterator(chunk_size=chunk_size)
+
+    started = time.monotonic()
+    count = 0
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'wt', newline='') as f:
+        writer = csv.writer(f) if fmt == 'csv' else None
+        if writer:
+            writer.writerow(COLUMNS)
+        for row in rows:
+            row = row[:-1] + (row[-1].isoformat(),)
+            if writer:
+                writer.writerow(row)
+            else:
+                f.write(json.dumps(dict(zip(COLUMNS, row))) + '\n')
+            count += 1
+    return path, count, time.monotonic() - started
+
+
+def _export_worker(args):
+    try:
+        return export_range(*args)
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = (
+        'Exports reviews to a JSONL or CSV file, gzip compressed when OUTPUT ends in .gz. '
+        'Reviews are read in chunks through a server-side cursor, and can be split into '
+        'disjoint id ranges exported by parallel workers.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('output')
+        parser.add_argument('--format', choices=['jsonl', 'csv'], help='Defaults to the file extension.')
+        parser.add_argument('--user', help='Only export reviews owned by this username.')
+        parser.add_argument('--company')
+        parser.add_argument('--since', help='Only export reviews created at or after this date or datetime.')
+        parser.add_argument('--until', help='Only export reviews created before this date or datetime.')
+        parser.add_argument('--chunk-size', type=int, default=settings.REVIEWS_EXPORT_CHUNK_SIZE)
+        parser.add_argument('--workers', type=int, default=1, help='Split the export into this many files.')
+        parser.add_argument('--id-range', help='Only export ids in START:END (END exclusive).')
+
+    def handle(self, *args, **options):
+        output = options['output']
+        fmt = options['format'] or ('csv' if '.csv' in os.path.basename(output) else 'jsonl')
+        filters = self._get_filters(options)
+
+        if options['id_range']:
+            jobs = [(output, fmt, filters, self._parse_id_range(options['id_range']), options['chunk_size'])]
+        else:
+            ranges = self._split(filters, options['workers'])
+            if len(ranges) > 1:
+                jobs = [
+                    (self._part_path(output, i), fmt, filters, id_range, options['chunk_size'])
+                    for i, id_range in enumerate(ranges, 1)
+                ]
+            else:
+                jobs = [(output, fmt, filters, None, options['chunk_size'])]
+
+        started = time.monotonic()
+        if len(jobs) > 1:
+            connections.close_all()
+            with multiprocessing.Pool(len(jobs)) as pool:
+                results = pool.map(_export_worker, jobs)
+        else:
+            results = [export_range(*jobs[0])]
+
+        for path, count, seconds in results:
+            self.stdout.write('Wrote {} rows to {} ({:.0f} rows/s).'.format(
+                count, path, count / seconds if seconds else 0
+            ))
+        total = sum(count for _, count, _ in results)
+        seconds = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS('Exported {} reviews in {:.1f}s ({:.0f} rows/s).'.format(
+            total, seconds, total / seconds if seconds else 0
+        )))
+
+    def _get_filters(self, options):
+        filters = {}
+        if options['user']:
+            filters['user__username'] = options['user']
+        if options['company']:
+            filters['company'] = options['company']
+        if options['since']:
+            filters['created_at__gte'] = self._parse_datetime(options['since'])
+        if options['until']:
+            filters['created_at__lt'] = self._parse_datetime(options['until'])
+        return filters
+
+    def _parse_datetime(self, value):
+        parsed = parse_datetime(value)
+        if parsed is None:
+            date = parse_date(value)
+            if date is None:
+                raise CommandError('Invalid date {!r}.'.format(value))
+            parsed = datetime.combine(date, datetime.min.time())
+        if timezone.is_naive(parsed):
+            parsed = timezone.make_aware(parsed)
+        return parsed
+
+    def _parse_id_range(self, value):
+        try:
+            start, end = (int(bound) for bound in value.split(':'))
+        except ValueError:
+            raise CommandError('Invalid id range {!r}, expected START:END.'.format(value))
+        return start, end
+
+    def _split(self, filters, workers):
+        bounds = Review.objects.filter(**filters).aggregate(low=Min('id'), high=Max('id'))
+        if workers < 2 or bounds['low'] is None:
+            return [None]
+        low, high = bounds['low'], bounds['high'] + 1
+        step = max(1, -(-(high - low) // workers))
+        return [(start, min(start + step, high)) for start in range(low, high, step)]
+
+    def _part_path(self, output, part):
+        directory, name = os.path.split(output)
+        base, dot, extension = name.partition('.')
+        return os.path.join(directory, '{}.part{}{}{}'.format(base, part, dot, extension))
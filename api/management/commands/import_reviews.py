@@ -0,0 +1,130 @@
+import csv
+import json
+import os
+import time
+from collections import namedtuple
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from api.cache import bump_list_version
+from api.models import ImportCheckpoint, Review
+from api.serializers import ReviewSerializer
+
+InvalidLine = namedtuple('InvalidLine', ('line', 'error'))
+
+
+class Command(BaseCommand):
+    help = (
+        'Imports reviews from a JSONL or CSV file in chunks. Each row holds the review fields '
+        'and the username of its owner. Invalid rows are written to a rejects file, and an '
+        'interrupted import resumes from its checkpoint.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=['jsonl', 'csv'], help='Defaults to the file extension.')
+        parser.add_argument('--user', help='Username for rows without a "user" column.')
+        parser.add_argument('--ip-address', default='127.0.0.1', help='IP address for rows without one.')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--checkpoint', help='Checkpoint name. Defaults to the absolute PATH.')
+        parser.add_argument('--rejects', help='Defaults to PATH.rejects.')
+        parser.add_argument('--restart', action='store_true', help='Ignore an existing checkpoint.')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if not os.path.exists(path):
+            raise CommandError('File {} does not exist.'.format(path))
+        fmt = options['format'] or ('csv' if path.endswith('.csv') else 'jsonl')
+        checkpoint = options['checkpoint'] or os.path.abspath(path)
+        rejects_path = options['rejects'] or path + '.rejects'
+
+        if options['restart']:
+            ImportCheckpoint.objects.filter(name=checkpoint).delete()
+        skip = ImportCheckpoint.objects.filter(name=checkpoint).values_list('rows', flat=True).first() or 0
+        if skip:
+            self.stdout.write('Resuming after row {}.'.format(skip))
+
+        self.default_user = options['user']
+        self.ip_address = options['ip_address']
+        self.user_ids = {}
+        imported = rejected = 0
+        started = time.monotonic()
+
+        with open(path, newline='') as f, open(rejects_path, 'a' if skip else 'w') as rejects:
+            rows = self._read(f, fmt)
+            position = skip
+            for _ in range(skip):
+                next(rows, None)
+
+            while True:
+                chunk = [row for _, row in zip(range(options['batch_size']), rows)]
+                if not chunk:
+                    break
+                reviews, errors = self._validate(chunk, position)
+                position += len(chunk)
+                with transaction.atomic():
+                    Review.objects.copy_many(reviews)
+                    ImportCheckpoint.objects.update_or_create(name=checkpoint, defaults={'rows': position})
+                for user_id in {review.user_id for review in reviews}:
+                    bump_list_version(user_id)
+
+                for error in errors:
+                    rejects.write(json.dumps(error) + '\n')
+                rejects.flush()
+
+                imported += len(reviews)
+                rejected += len(errors)
+                elapsed = time.monotonic() - started
+                self.stdout.write('{} rows imported, {} rejected ({:.0f} rows/s).'.format(
+                    imported, rejected, (imported + rejected) / elapsed if elapsed else 0
+                ))
+
+        ImportCheckpoint.objects.filter(name=checkpoint).delete()
+        self.stdout.write(self.style.SUCCESS('Imported {} reviews, rejected {}.'.format(imported, rejected)))
+
+    def _read(self, f, fmt):
+        if fmt == 'csv':
+            yield from csv.DictReader(f)
+            return
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError as e:
+                yield InvalidLine(line.rstrip('\n'), 'Invalid JSON: {}'.format(e))
+
+    def _validate(self, chunk, position):
+        self._resolve_users(chunk)
+        reviews = []
+        errors = []
+        for i, row in enumerate(chunk, position + 1):
+            if isinstance(row, InvalidLine):
+                errors.append({'row': i, 'data': row.line, 'errors': {'non_field_errors': [row.error]}})
+                continue
+            if not isinstance(row, dict):
+                errors.append({'row': i, 'data': row, 'errors': {'non_field_errors': ['Expected an object.']}})
+                continue
+
+            data = dict(row)
+            data.setdefault('ip_address', self.ip_address)
+            username = data.pop('user', None) or self.default_user
+            serializer = ReviewSerializer(data=data)
+            if not serializer.is_valid():
+                errors.append({'row': i, 'data': row, 'errors': serializer.errors})
+            elif username not in self.user_ids:
+                errors.append({'row': i, 'data': row, 'errors': {'user': ['Unknown user {!r}.'.format(username)]}})
+            else:
+                reviews.append(Review(user_id=self.user_ids[username], **serializer.validated_data))
+        return reviews, errors
+
+    def _resolve_users(self, chunk):
+        usernames = {
+            (row.get('user') if isinstance(row, dict) else None) or self.default_user
+            for row in chunk
+        }
+        missing = usernames - set(self.user_ids) - {None}
+        if missing:
+            self.user_ids.update(User.objects.filter(username__in=missing).values_list('username', 'id'))
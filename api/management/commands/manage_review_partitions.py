@@ -0,0 +1,39 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from api import archive
+
+
+class Command(BaseCommand):
+    help = (
+        'Moves reviews not modified for ARCHIVE_AFTER_DAYS into the archive, pre-creates its '
+        'upcoming monthly partitions and detaches partitions older than RETENTION_MONTHS.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--archive-after-days', type=int, default=settings.REVIEWS_ARCHIVE_AFTER_DAYS)
+        parser.add_argument('--months-ahead', type=int, default=3)
+        parser.add_argument('--retention-months', type=int, default=settings.REVIEWS_ARCHIVE_RETENTION_MONTHS)
+        parser.add_argument('--drop-detached', action='store_true', help='Drop partitions after detaching them.')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        cutoff = now - timedelta(days=options['archive_after_days'])
+
+        created = archive.ensure_partitions(cutoff, archive.add_months(cutoff, options['months_ahead']))
+        for name in created:
+            self.stdout.write('Partition {} is ready.'.format(name))
+
+        count = archive.archive_reviews(cutoff, options['batch_size'])
+        self.stdout.write('Archived {} reviews.'.format(count))
+
+        if options['retention_months'] is not None:
+            before = archive.add_months(archive.month_start(now), -options['retention_months'])
+            for name in archive.detach_partitions(before, drop=options['drop_detached']):
+                self.stdout.write('Detached partition {}.'.format(name))
+
+        self.stdout.write(self.style.SUCCESS('Done.'))
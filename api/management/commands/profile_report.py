@@ -0,0 +1,43 @@
+import os
+import pstats
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api import profiling
+
+
+class Command(BaseCommand):
+    help = 'Aggregates sampled request profiles into the TOP hottest functions per endpoint.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=20)
+        parser.add_argument('--sort', choices=['tottime', 'cumtime'], default='tottime')
+        parser.add_argument('--view', help='Only report this view, e.g. api.views.ReviewListView.')
+        parser.add_argument('--dir', default=settings.REVIEWS_PROFILE_DIR)
+
+    def handle(self, *args, **options):
+        profiles = profiling.load_profiles(options['dir']) if os.path.isdir(options['dir']) else {}
+        if options['view']:
+            profiles = {view: entries for view, entries in profiles.items() if view == options['view']}
+        if not profiles:
+            self.stdout.write('No profiles found.')
+            return
+
+        index = 2 if options['sort'] == 'tottime' else 3
+        for view, entries in sorted(profiles.items()):
+            count = len(entries)
+            queries = [tags['queries'] for _, tags in entries if tags['queries'] is not None]
+            self.stdout.write(self.style.MIGRATE_HEADING('{} ({} requests, {:.1f}ms, {:.1f} queries on average)'.format(
+                view, count,
+                sum(tags['duration'] for _, tags in entries) / count * 1000,
+                sum(queries) / len(queries) if queries else 0,
+            )))
+            self.stdout.write('  {:>10} {:>10} {:>8}  function'.format('tottime', 'cumtime', 'calls'))
+
+            stats = pstats.Stats(*[path for path, _ in entries])
+            rows = sorted(stats.stats.items(), key=lambda item: item[1][index], reverse=True)
+            for func, (_, calls, tottime, cumtime, _) in rows[:options['top']]:
+                self.stdout.write('  {:>8.2f}ms {:>8.2f}ms {:>8}  {}'.format(
+                    tottime / count * 1000, cumtime / count * 1000, calls // count, pstats.func_std_string(func)
+                ))
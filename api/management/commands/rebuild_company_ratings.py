@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from api.models import CompanyRating
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the per-company rating aggregates from the live and archived reviews.'
+
+    def handle(self, *args, **options):
+        count = CompanyRating.objects.rebuild()
+        self.stdout.write(self.style.SUCCESS('Rebuilt rating aggregates for {} companies.'.format(count)))
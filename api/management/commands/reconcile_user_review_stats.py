@@ -0,0 +1,50 @@
+import multiprocessing
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.db.models import Max, Min
+
+from api.models import UserReviewStats
+
+
+def reconcile_range(id_range):
+    user_ids = list(User.objects.filter(id__gte=id_range[0], id__lt=id_range[1]).values_list('id', flat=True))
+    return len(user_ids), UserReviewStats.objects.reconcile(user_ids)
+
+
+def _reconcile_worker(id_range):
+    try:
+        return reconcile_range(id_range)
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = 'Recomputes per-user review counts and rating sums and repairs rows that drifted.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Users per batch.')
+        parser.add_argument('--workers', type=int, default=1, help='Batches reconciled in parallel.')
+
+    def handle(self, *args, **options):
+        bounds = User.objects.aggregate(low=Min('id'), high=Max('id'))
+        if bounds['low'] is None:
+            self.stdout.write(self.style.SUCCESS('No users to reconcile.'))
+            return
+
+        batch_size = options['batch_size']
+        ranges = [
+            (start, start + batch_size)
+            for start in range(bounds['low'], bounds['high'] + 1, batch_size)
+        ]
+        if options['workers'] > 1:
+            connections.close_all()
+            with multiprocessing.Pool(options['workers']) as pool:
+                results = pool.map(_reconcile_worker, ranges)
+        else:
+            results = [reconcile_range(id_range) for id_range in ranges]
+
+        checked = sum(count for count, _ in results)
+        repaired = sum(count for _, count in results)
+        self.stdout.write(self.style.SUCCESS('Repaired review stats for {} of {} users.'.format(repaired, checked)))
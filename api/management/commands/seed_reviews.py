@@ -0,0 +1,42 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+
+from api.cache import bump_list_version
+from api.models import Review
+
+
+class Command(BaseCommand):
+    help = 'Creates USERS users with REVIEWS reviews each, for load testing.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10)
+        parser.add_argument('--reviews', type=int, default=100)
+        parser.add_argument('--prefix', default='loadtest')
+        parser.add_argument('--password', default='loadtest_pwd')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        for i in range(options['users']):
+            username = '{}_{}'.format(options['prefix'], i)
+            user = User.objects.filter(username=username).first()
+            if user is None:
+                user = User.objects.create_user(username, password=options['password'])
+
+            reviews = [
+                Review(
+                    title='Review {}'.format(j),
+                    summary='Load test review {} by {}.'.format(j, username),
+                    rating=j % 6,
+                    ip_address='127.0.0.1',
+                    company='Company {}'.format(j % 50),
+                    reviewer='Reviewer {}'.format(j % 20),
+                    user=user,
+                )
+                for j in range(options['reviews'])
+            ]
+            Review.objects.create_many(reviews, batch_size=options['batch_size'])
+            bump_list_version(user.id)
+
+        self.stdout.write(self.style.SUCCESS('Seeded {} users with {} reviews each.'.format(
+            options['users'], options['reviews']
+        )))
@@ -0,0 +1,16 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from api.models import ReviewTombstone
+
+
+class Command(BaseCommand):
+    help = 'Deletes review tombstones older than REVIEWS_SYNC_TOMBSTONE_TTL.'
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(seconds=settings.REVIEWS_SYNC_TOMBSTONE_TTL)
+        count, _ = ReviewTombstone.objects.filter(deleted_at__lt=cutoff).delete()
+        self.stdout.write(self.style.SUCCESS('Deleted {} review tombstones.'.format(count)))
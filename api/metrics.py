@@ -0,0 +1,277 @@
+import fcntl
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+
+PHASES = ('auth', 'db', 'serialization', 'render', 'total')
+FILE_NAME = 'metrics-{}-{}.json'
+FILE_RE = re.compile(r'^metrics-(\d+)-(\d+)\.json$')
+EXITED_FILE = 'metrics-exited.json'
+LOCK_FILE = 'metrics.lock'
+
+_patterns = None
+
+
+def pattern_for(view_func):
+    global _patterns
+    if _patterns is None:
+        from api.urls import urlpatterns
+        _patterns = {pattern.callback: str(pattern.pattern) for pattern in urlpatterns}
+    return _patterns.get(view_func)
+
+
+class RequestTimer:
+    def __init__(self, pattern, query_counter=None):
+        self.pattern = pattern
+        self.query_counter = query_counter
+        self.auth = 0.0
+        self.auth_db = 0.0
+        self.render = 0.0
+        self.view_start = time.perf_counter()
+        self.view_db_start = self.db_time()
+        self.view_end = None
+        self.view_db_end = None
+
+    def db_time(self):
+        return self.query_counter.duration if self.query_counter is not None else 0.0
+
+    def end_view(self):
+        self.view_end = time.perf_counter()
+        self.view_db_end = self.db_time()
+
+    def end_render(self):
+        self.render = time.perf_counter() - self.view_end
+
+    def phases(self, total):
+        if self.view_end is None:
+            self.end_view()
+        view = self.view_end - self.view_start
+        db = self.view_db_end - self.view_db_start - self.auth_db
+        return {
+            'auth': self.auth,
+            'db': db,
+            'serialization': max(0.0, view - self.auth - db),
+            'render': self.render,
+            'total': total,
+        }
+
+
+class MetricsStore:
+    def __init__(self):
+        self._series = {}
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self._pid = None
+        self._started = None
+
+    def _check_process(self):
+        if self._pid != os.getpid():
+            self._series.clear()
+            self._pid = os.getpid()
+            self._started = int(time.time() * 1000)
+
+    def observe(self, pattern, method, status, phases):
+        buckets = settings.REVIEWS_METRICS_BUCKETS
+        with self._lock:
+            self._check_process()
+            series = self._series.get((pattern, method, status))
+            if series is None:
+                series = self._series[(pattern, method, status)] = {
+                    phase: {'buckets': [0] * (len(buckets) + 1), 'sum': 0.0} for phase in PHASES
+                }
+            for phase, seconds in phases.items():
+                histogram = series[phase]
+                histogram['buckets'][_bucket_index(buckets, seconds)] += 1
+                histogram['sum'] += seconds
+            due = time.monotonic() - self._last_flush >= settings.REVIEWS_METRICS_FLUSH_INTERVAL
+        if due:
+            self.flush()
+
+    def flush(self):
+        directory = settings.REVIEWS_METRICS_DIR
+        if not directory:
+            return
+        with self._lock:
+            self._check_process()
+            records = [list(key) + [series] for key, series in self._series.items()]
+            self._last_flush = time.monotonic()
+            name = FILE_NAME.format(self._pid, self._started)
+        os.makedirs(directory, exist_ok=True)
+        _write_json(os.path.join(directory, name), records)
+
+    def collect(self):
+        directory = settings.REVIEWS_METRICS_DIR
+        if not directory:
+            with self._lock:
+                return [list(key) + [series] for key, series in self._series.items()]
+
+        self.flush()
+        with _locked(directory):
+            live, exited = _scan(directory)
+            merged = _fold_exited(directory, exited)
+        for name in live:
+            records = _read_json(os.path.join(directory, name))
+            if records is not None:
+                _merge(merged, records)
+        return [list(key) + [series] for key, series in merged.items()]
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+
+store = MetricsStore()
+
+
+def _scan(directory):
+    latest = {}
+    exited = []
+    for name in os.listdir(directory):
+        match = FILE_RE.match(name)
+        if match is None:
+            continue
+        pid, started = int(match.group(1)), int(match.group(2))
+        if not _is_running(pid):
+            exited.append(name)
+            continue
+        previous = latest.get(pid)
+        if previous is not None and previous[0] > started:
+            exited.append(name)
+            continue
+        if previous is not None:
+            exited.append(previous[1])
+        latest[pid] = (started, name)
+    return [name for started, name in latest.values()], exited
+
+
+def _fold_exited(directory, exited):
+    path = os.path.join(directory, EXITED_FILE)
+    aggregate = _read_json(path) or {'files': [], 'records': []}
+    merged = {}
+    _merge(merged, aggregate['records'])
+    pending = [name for name in exited if name not in aggregate['files']]
+    if pending:
+        for name in pending:
+            records = _read_json(os.path.join(directory, name))
+            if records is not None:
+                _merge(merged, records)
+        _write_json(path, {
+            'files': exited,
+            'records': [list(key) + [series] for key, series in merged.items()],
+        })
+    for name in exited:
+        _remove(os.path.join(directory, name))
+    return merged
+
+
+def _merge(merged, records):
+    for pattern, method, status, series in records:
+        current = merged.get((pattern, method, status))
+        if current is None:
+            merged[(pattern, method, status)] = series
+            continue
+        for phase, histogram in series.items():
+            current[phase]['buckets'] = [a + b for a, b in zip(current[phase]['buckets'], histogram['buckets'])]
+            current[phase]['sum'] += histogram['sum']
+
+
+@contextmanager
+def _locked(directory):
+    with open(os.path.join(directory, LOCK_FILE), 'a') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _read_json(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_json(path, data):
+    with open(path + '.tmp', 'w') as f:
+        json.dump(data, f)
+    os.replace(path + '.tmp', path)
+
+
+def _is_running(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _bucket_index(buckets, seconds):
+    for i, bound in enumerate(buckets):
+        if seconds <= bound:
+            return i
+    return len(buckets)
+
+
+def _labels(**labels):
+    return ','.join(
+        '{}="{}"'.format(name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in labels.items()
+    )
+
+
+def render_prometheus(records):
+    buckets = settings.REVIEWS_METRICS_BUCKETS
+    records = sorted(records, key=lambda record: record[:3])
+    lines = [
+        '# HELP reviews_requests_total Requests handled by the API views.',
+        '# TYPE reviews_requests_total counter',
+    ]
+    for pattern, method, status, series in records:
+        lines.append('reviews_requests_total{{{}}} {}'.format(
+            _labels(pattern=pattern, method=method, status=status), sum(series['total']['buckets'])
+        ))
+
+    lines += [
+        '# HELP reviews_request_duration_seconds Time spent in each phase of the request.',
+        '# TYPE reviews_request_duration_seconds histogram',
+    ]
+    for pattern, method, status, series in records:
+        for phase in PHASES:
+            histogram = series[phase]
+            labels = _labels(pattern=pattern, method=method, status=status, phase=phase)
+            count = 0
+            for bound, value in zip(list(buckets) + ['+Inf'], histogram['buckets']):
+                count += value
+                lines.append('reviews_request_duration_seconds_bucket{{{},le="{}"}} {}'.format(labels, bound, count))
+            lines.append('reviews_request_duration_seconds_sum{{{}}} {}'.format(labels, histogram['sum']))
+            lines.append('reviews_request_duration_seconds_count{{{}}} {}'.format(labels, count))
+    return '\n'.join(lines) + '\n'
+
+
+class MetricsMixin:
+    def perform_authentication(self, request):
+        timer = getattr(request._request, 'metrics_timer', None)
+        if timer is None:
+            return super().perform_authentication(request)
+        start, db_start = time.perf_counter(), timer.db_time()
+        try:
+            super().perform_authentication(request)
+        finally:
+            timer.auth += time.perf_counter() - start
+            timer.auth_db += timer.db_time() - db_start
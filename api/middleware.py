@@ -0,0 +1,178 @@
+import cProfile
+import gzip
+import logging
+import re
+import time
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_sequence
+
+from api import metrics, profiling, routers
+from api.instrumentation import QueryCounter
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger('api.queries')
+
+ACCEPTS_BR_RE = re.compile(r'\bbr\b')
+ACCEPTS_GZIP_RE = re.compile(r'\bgzip\b')
+
+
+class QueryInstrumentationMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.query_counter = QueryCounter()
+        with request.query_counter:
+            response = self.get_response(request)
+
+        counter = request.query_counter
+        repeated = counter.repeated(settings.REVIEWS_REPEATED_QUERY_THRESHOLD)
+        for shape, count in repeated.items():
+            logger.warning(
+                'Query repeated %d times in %s %s: %s',
+                count, request.method, request.path, shape
+            )
+
+        if settings.DEBUG:
+            response['X-Query-Count'] = counter.count
+            response['X-Query-Time'] = '{:.3f}'.format(counter.duration * 1000)
+            response['X-Query-Repeated'] = len(repeated)
+        return response
+
+
+class MetricsMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        start = time.perf_counter()
+        response = self.get_response(request)
+
+        timer = getattr(request, 'metrics_timer', None)
+        if timer is not None:
+            metrics.store.observe(
+                timer.pattern, request.method, response.status_code,
+                timer.phases(time.perf_counter() - start)
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        pattern = metrics.pattern_for(view_func)
+        if pattern is not None:
+            request.metrics_timer = metrics.RequestTimer(pattern, getattr(request, 'query_counter', None))
+
+    def process_template_response(self, request, response):
+        timer = getattr(request, 'metrics_timer', None)
+        if timer is not None:
+            timer.end_view()
+            response.add_post_render_callback(lambda response: timer.end_render())
+        return response
+
+
+class ReplicaPinningMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        routers.set_request(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            routers.clear_request()
+
+        user = getattr(request, 'user', None)
+        if (request.method not in routers.SAFE_METHODS and response.status_code < 400 and
+                user is not None and user.is_authenticated):
+            routers.pin_user(user.id)
+            routers.pin_response(response, user.id)
+        return response
+
+
+class ProfilingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not profiling.should_profile(request):
+            return self.get_response(request)
+
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        profiler.enable()
+        try:
+            response = self.get_response(request)
+        finally:
+            profiler.disable()
+        duration = time.perf_counter() - start
+
+        match = request.resolver_match
+        counter = getattr(request, 'query_counter', None)
+        name = profiling.write_profile(profiler, {
+            'view': match.view_name if match else request.path,
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'duration': duration,
+            'queries': counter.count if counter else None,
+        })
+        response['X-Profile-Id'] = name
+        return response
+
+
+class CompressionMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if response.has_header('Content-Encoding'):
+            return response
+        if not response.streaming and len(response.content) < settings.REVIEWS_COMPRESSION_MIN_SIZE:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        accept = request.META.get('HTTP_ACCEPT_ENCODING', '')
+        if brotli is not None and ACCEPTS_BR_RE.search(accept):
+            encoding = 'br'
+        elif ACCEPTS_GZIP_RE.search(accept):
+            encoding = 'gzip'
+        else:
+            return response
+
+        if response.streaming:
+            if encoding == 'br':
+                response.streaming_content = self._brotli_sequence(response.streaming_content)
+            else:
+                response.streaming_content = compress_sequence(response.streaming_content)
+            del response['Content-Length']
+        else:
+            content = self._compress(response.content, encoding)
+            if len(content) >= len(response.content):
+                return response
+            response.content = content
+            response['Content-Length'] = str(len(content))
+
+        etag = response.get('ETag')
+        if etag and not etag.startswith('W/'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = encoding
+        return response
+
+    def _compress(self, content, encoding):
+        if encoding == 'br':
+            return brotli.compress(content, quality=settings.REVIEWS_BROTLI_QUALITY)
+        return gzip.compress(content, compresslevel=settings.REVIEWS_GZIP_LEVEL)
+
+    def _brotli_sequence(self, sequence):
+        compressor = brotli.Compressor(quality=settings.REVIEWS_BROTLI_QUALITY)
+        for item in sequence:
+            chunk = compressor.process(item)
+            if chunk:
+                yield chunk
+        yield compressor.finish()
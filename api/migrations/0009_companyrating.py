@@ -0,0 +1,45 @@
+# Generated by Django 2.1.15 on 2026-10-17 18:38
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def populate_company_ratings(apps, schema_editor):
+    Review = apps.get_model('api', 'Review')
+    CompanyRating = apps.get_model('api', 'CompanyRating')
+    db_alias = schema_editor.connection.alias
+    ratings = {}
+    rows = Review.objects.using(db_alias).values('company', 'rating').annotate(count=Count('id')).order_by()
+    for row in rows:
+        company_rating = ratings.setdefault(row['company'], CompanyRating(company=row['company']))
+        company_rating.review_count += row['count']
+        company_rating.rating_sum += row['count'] * row['rating']
+        field = 'rating_{}'.format(row['rating'])
+        setattr(company_rating, field, getattr(company_rating, field) + row['count'])
+    CompanyRating.objects.using(db_alias).bulk_create(ratings.values())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_authtoken'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CompanyRating',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('company', models.CharField(max_length=24, unique=True)),
+                ('review_count', models.PositiveIntegerField(default=0)),
+                ('rating_sum', models.PositiveIntegerField(default=0)),
+                ('rating_0', models.PositiveIntegerField(default=0)),
+                ('rating_1', models.PositiveIntegerField(default=0)),
+                ('rating_2', models.PositiveIntegerField(default=0)),
+                ('rating_3', models.PositiveIntegerField(default=0)),
+                ('rating_4', models.PositiveIntegerField(default=0)),
+                ('rating_5', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(populate_company_ratings, migrations.RunPython.noop),
+    ]
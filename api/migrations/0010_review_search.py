@@ -0,0 +1,46 @@
+from django.db import migrations
+
+FORWARD_SQL = [
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    'ALTER TABLE api_review ADD COLUMN search_vector tsvector',
+    "UPDATE api_review SET search_vector = to_tsvector('pg_catalog.english', "
+    "coalesce(title, '') || ' ' || coalesce(summary, ''))",
+    'CREATE INDEX api_review_search_vector_idx ON api_review USING gin (search_vector)',
+    'CREATE INDEX api_review_company_trgm_idx ON api_review '
+    'USING gin ((UPPER(company::text)) gin_trgm_ops)',
+    'CREATE INDEX api_review_reviewer_trgm_idx ON api_review '
+    'USING gin ((UPPER(reviewer::text)) gin_trgm_ops)',
+    'CREATE TRIGGER api_review_search_vector_trigger '
+    'BEFORE INSERT OR UPDATE OF title, summary ON api_review FOR EACH ROW '
+    "EXECUTE PROCEDURE tsvector_update_trigger(search_vector, 'pg_catalog.english', title, summary)",
+]
+
+BACKWARD_SQL = [
+    'DROP TRIGGER IF EXISTS api_review_search_vector_trigger ON api_review',
+    'DROP INDEX IF EXISTS api_review_reviewer_trgm_idx',
+    'DROP INDEX IF EXISTS api_review_company_trgm_idx',
+    'ALTER TABLE api_review DROP COLUMN IF EXISTS search_vector',
+]
+
+
+def forwards(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        for sql in FORWARD_SQL:
+            schema_editor.execute(sql)
+
+
+def backwards(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        for sql in BACKWARD_SQL:
+            schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_companyrating'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 2.1.15 on 2026-10-17 18:53
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import migrations, models
+import django.db.models.deletion
+
+PARTITION_SQL = [
+    'ALTER TABLE api_archivedreview RENAME TO api_archivedreview_old',
+    'CREATE TABLE api_archivedreview (LIKE api_archivedreview_old INCLUDING DEFAULTS INCLUDING CONSTRAINTS) '
+    'PARTITION BY RANGE (created_at)',
+    'ALTER TABLE api_archivedreview ADD PRIMARY KEY (id, created_at)',
+    'ALTER TABLE api_archivedreview ADD CONSTRAINT api_archivedreview_user_id_fk '
+    'FOREIGN KEY (user_id) REFERENCES auth_user (id) DEFERRABLE INITIALLY DEFERRED',
+    'CREATE INDEX api_archivedreview_user_id_idx ON api_archivedreview (user_id)',
+    'DROP TABLE api_archivedreview_old',
+]
+
+
+def partition_archive(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        if schema_editor.connection.pg_version < 110000:
+            raise ImproperlyConfigured(
+                'The review archive is partitioned by month and needs PostgreSQL 11 or newer.'
+            )
+        for sql in PARTITION_SQL:
+            schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('api', '0012_auto_20261017_1847'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedReview',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=64)),
+                ('summary', models.CharField(max_length=10000)),
+                ('rating', models.PositiveIntegerField()),
+                ('ip_address', models.GenericIPAddressField()),
+                ('company', models.CharField(max_length=24)),
+                ('reviewer', models.CharField(max_length=24)),
+                ('created_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_reviews', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.RunPython(partition_archive, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,98 @@
+# Generated by Django 2.1.15 on 2026-10-17 18:56
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+SEARCH_TRIGGER_SQL = [
+    'DROP TRIGGER IF EXISTS api_review_search_vector_trigger ON api_review',
+    '''CREATE FUNCTION api_review_search_vector() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector := to_tsvector('pg_catalog.english', coalesce(NEW.title, '') || ' ' ||
+            coalesce((SELECT summary FROM api_reviewbody WHERE review_id = NEW.id), ''));
+        RETURN NEW;
+    END $$ LANGUAGE plpgsql''',
+    'CREATE TRIGGER api_review_search_vector_trigger '
+    'BEFORE INSERT OR UPDATE OF title ON api_review FOR EACH ROW '
+    'EXECUTE PROCEDURE api_review_search_vector()',
+    '''CREATE FUNCTION api_reviewbody_search_vector() RETURNS trigger AS $$
+    BEGIN
+        UPDATE api_review SET search_vector = to_tsvector('pg_catalog.english',
+            coalesce(title, '') || ' ' || coalesce(NEW.summary, ''))
+        WHERE id = NEW.review_id;
+        RETURN NULL;
+    END $$ LANGUAGE plpgsql''',
+    'CREATE TRIGGER api_reviewbody_search_vector_trigger '
+    'AFTER INSERT OR UPDATE OF summary ON api_reviewbody FOR EACH ROW '
+    'EXECUTE PROCEDURE api_reviewbody_search_vector()',
+]
+
+REVERSE_SEARCH_TRIGGER_SQL = [
+    'DROP TRIGGER IF EXISTS api_reviewbody_search_vector_trigger ON api_reviewbody',
+    'DROP FUNCTION IF EXISTS api_reviewbody_search_vector()',
+    'DROP TRIGGER IF EXISTS api_review_search_vector_trigger ON api_review',
+    'DROP FUNCTION IF EXISTS api_review_search_vector()',
+    'CREATE TRIGGER api_review_search_vector_trigger '
+    'BEFORE INSERT OR UPDATE OF title, summary ON api_review FOR EACH ROW '
+    "EXECUTE PROCEDURE tsvector_update_trigger(search_vector, 'pg_catalog.english', title, summary)",
+]
+
+
+def copy_summaries(apps, schema_editor):
+    Review = apps.get_model('api', 'Review')
+    ReviewBody = apps.get_model('api', 'ReviewBody')
+    db_alias = schema_editor.connection.alias
+    bodies = []
+    for review in Review.objects.using(db_alias).values('id', 'summary').iterator(chunk_size=2000):
+        bodies.append(ReviewBody(review_id=review['id'], summary=review['summary']))
+        if len(bodies) == 2000:
+            ReviewBody.objects.using(db_alias).bulk_create(bodies)
+            bodies = []
+    ReviewBody.objects.using(db_alias).bulk_create(bodies)
+
+
+def restore_summaries(apps, schema_editor):
+    Review = apps.get_model('api', 'Review')
+    ReviewBody = apps.get_model('api', 'ReviewBody')
+    db_alias = schema_editor.connection.alias
+    for body in ReviewBody.objects.using(db_alias).values('review_id', 'summary').iterator(chunk_size=2000):
+        Review.objects.using(db_alias).filter(id=body['review_id']).update(summary=body['summary'])
+
+
+def update_search_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        for sql in SEARCH_TRIGGER_SQL:
+            schema_editor.execute(sql)
+
+
+def restore_search_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        for sql in REVERSE_SEARCH_TRIGGER_SQL:
+            schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_archivedreview'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReviewBody',
+            fields=[
+                ('review', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='body', serialize=False, to='api.Review')),
+                ('summary', models.CharField(max_length=10000)),
+            ],
+        ),
+        migrations.RunPython(copy_summaries, restore_summaries),
+        migrations.RunPython(update_search_trigger, restore_search_trigger),
+        migrations.AlterField(
+            model_name='review',
+            name='summary',
+            field=models.CharField(default='', max_length=10000),
+        ),
+        migrations.RemoveField(
+            model_name='review',
+            name='summary',
+        ),
+    ]
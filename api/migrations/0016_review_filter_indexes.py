@@ -0,0 +1,25 @@
+# Generated by Django 2.1.15 on 2026-10-17 19:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0015_review_admin_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['user', 'rating', 'created_at', 'id'], name='api_review_user_rating_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['user', 'company', 'created_at', 'id'], name='api_review_user_company_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['user', 'reviewer', 'created_at', 'id'], name='api_review_user_reviewer_idx'),
+        ),
+    ]
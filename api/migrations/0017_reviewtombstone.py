@@ -0,0 +1,26 @@
+# Generated by Django 2.1.15 on 2026-10-17 19:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0016_review_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReviewTombstone',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('review_id', models.IntegerField()),
+                ('user_id', models.IntegerField()),
+                ('deleted_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='reviewtombstone',
+            index=models.Index(fields=['user_id', 'deleted_at', 'id'], name='api_tombstone_user_deleted_idx'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 2.1.15 on 2026-10-17 19:23
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+import django.db.models.deletion
+
+
+def populate_user_review_stats(apps, schema_editor):
+    UserReviewStats = apps.get_model('api', 'UserReviewStats')
+    db_alias = schema_editor.connection.alias
+    stats = {}
+    for model_name in ('Review', 'ArchivedReview'):
+        rows = apps.get_model('api', model_name).objects.using(db_alias).values('user_id').annotate(
+            count=Count('id'), rating_sum=Sum('rating')
+        ).order_by()
+        for row in rows.iterator():
+            user_stats = stats.setdefault(row['user_id'], UserReviewStats(user_id=row['user_id']))
+            user_stats.review_count += row['count']
+            user_stats.rating_sum += row['rating_sum']
+    UserReviewStats.objects.using(db_alias).bulk_create(stats.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0009_alter_user_last_name_max_length'),
+        ('api', '0017_reviewtombstone'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserReviewStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='review_stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('review_count', models.PositiveIntegerField(default=0)),
+                ('rating_sum', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(populate_user_review_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 2.1.15 on 2026-10-17 19:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0018_userreviewstats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reviewsubmission',
+            name='error',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AlterField(
+            model_name='reviewsubmission',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=8),
+        ),
+    ]
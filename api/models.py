@@ -1,9 +1,112 @@
-from django.db import models
+import csv
+import hashlib
+import io
+import json
+import secrets
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError, IntegrityError, connection, connections, models, transaction
+from django.db.models import Case, Count, F, IntegerField, Sum, Value, When
+from django.utils import timezone
+
+from api.cache import bump_list_version
+
+
+class ReviewManager(models.Manager):
+    def create_many(self, reviews, batch_size=None):
+        if not connection.features.can_return_ids_from_bulk_insert:
+            for review in reviews:
+                review.save()
+            return reviews
+
+        with transaction.atomic():
+            reviews = self.bulk_create(reviews, batch_size=batch_size)
+            bodies = ReviewBody.objects.bulk_create(
+                [ReviewBody(review_id=review.id, summary=review.summary) for review in reviews],
+                batch_size=batch_size
+            )
+            for review, body in zip(reviews, bodies):
+                review._summary = None
+                review.body = body
+            CompanyRating.objects.add_reviews(reviews)
+            UserReviewStats.objects.add_reviews(reviews)
+        return reviews
+
+    def copy_many(self, reviews):
+        if connection.vendor != 'postgresql':
+            return self.create_many(reviews)
+
+        now = timezone.now()
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT nextval(pg_get_serial_sequence(%s, %s)) FROM generate_series(1, %s)',
+                [self.model._meta.db_table, 'id', len(reviews)]
+            )
+            for review, (id,) in zip(reviews, cursor.fetchall()):
+                review.id = id
+                review.created_at = now
+                review._state.adding = False
+                review._state.db = connection.alias
+
+            fields = ['id', 'title', 'rating', 'ip_address', 'company', 'reviewer', 'user', 'created_at']
+            _copy_rows(cursor, self.model, fields, [
+                [getattr(review, self.model._meta.get_field(name).attname) for name in fields]
+                for review in reviews
+            ])
+            _copy_rows(cursor, ReviewBody, ['review', 'summary'], [
+                [review.id, review.summary] for review in reviews
+            ])
+            CompanyRating.objects.add_reviews(reviews)
+            UserReviewStats.objects.add_reviews(reviews)
+        return reviews
+
+    def bulk_delete(self, queryset, batch_size=1000):
+        ids = list(queryset.order_by().values_list('id', flat=True))
+        user_ids = set()
+        deleted = 0
+        with transaction.atomic():
+            for start in range(0, len(ids), batch_size):
+                batch_ids = ids[start:start + batch_size]
+                batch = self.filter(id__in=batch_ids)
+                counts = batch.values('company', 'user_id', 'rating').annotate(count=Count('id')).order_by()
+                for row in counts:
+                    CompanyRating.objects.add(row['company'], row['rating'], delta=-row['count'])
+                    UserReviewStats.objects.add(row['user_id'], row['rating'], delta=-row['count'])
+                owners = list(batch.values_list('id', 'user_id'))
+                user_ids.update(user_id for _, user_id in owners)
+
+                ReviewSubmission.objects.filter(review__in=batch).update(review=None)
+                ReviewBody.objects.filter(review__in=batch).delete()
+                database = connections[batch.db]
+                with database.cursor() as cursor:
+                    cursor.execute('DELETE FROM {} WHERE id IN ({})'.format(
+                        database.ops.quote_name(self.model._meta.db_table), ', '.join(['%s'] * len(batch_ids))
+                    ), batch_ids)
+                    deleted += cursor.rowcount
+                ReviewTombstone.objects.bulk_create([
+                    ReviewTombstone(review_id=review_id, user_id=user_id) for review_id, user_id in owners
+                ])
+
+        for user_id in user_ids:
+            bump_list_version(user_id)
+        return deleted
+
+
+def _copy_rows(cursor, model, fields, rows):
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    buffer.seek(0)
+    columns = ', '.join(model._meta.get_field(name).column for name in fields)
+    cursor.copy_expert(
+        'COPY {} ({}) FROM STDIN WITH (FORMAT csv)'.format(model._meta.db_table, columns),
+        buffer
+    )
 
 
 class Review(models.Model):
     title = models.CharField(max_length=64)
-    summary = models.CharField(max_length=10000)
     rating = models.PositiveIntegerField()
     ip_address = models.GenericIPAddressField()
     company = models.CharField(max_length=24)
@@ -15,5 +118,405 @@ class Review(models.Model):
     )
     created_at = models.DateTimeField(auto_now=True)
 
+    objects = ReviewManager()
+
+    _summary = None
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'created_at', 'id'], name='api_review_user_created_idx'),
+            models.Index(fields=['created_at', 'id'], name='api_review_created_idx'),
+            models.Index(fields=['rating', 'created_at', 'id'], name='api_review_rating_created_idx'),
+            models.Index(fields=['user', 'rating', 'created_at', 'id'], name='api_review_user_rating_idx'),
+            models.Index(fields=['user', 'company', 'created_at', 'id'], name='api_review_user_company_idx'),
+            models.Index(fields=['user', 'reviewer', 'created_at', 'id'], name='api_review_user_reviewer_idx'),
+        ]
+
+    @property
+    def summary(self):
+        if self._summary is not None:
+            return self._summary
+        try:
+            return self.body.summary
+        except ReviewBody.DoesNotExist:
+            return ''
+
+    @summary.setter
+    def summary(self, value):
+        self._summary = value
+
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if self._summary is None:
+                return
+            if adding:
+                body = ReviewBody.objects.create(review_id=self.pk, summary=self._summary)
+            else:
+                body, created = ReviewBody.objects.update_or_create(
+                    review_id=self.pk,
+                    defaults={'summary': self._summary}
+                )
+            self._summary = None
+            self.body = body
+
     def __str__(self):
         return self.title
+
+
+class ReviewBody(models.Model):
+    review = models.OneToOneField(
+        Review,
+        related_name='body',
+        primary_key=True,
+        on_delete=models.CASCADE
+    )
+    summary = models.CharField(max_length=10000)
+
+    def __str__(self):
+        return str(self.review_id)
+
+
+class AuthToken(models.Model):
+    key_digest = models.CharField(max_length=64, unique=True)
+    user = models.ForeignKey(
+        'auth.User',
+        related_name='auth_tokens',
+        on_delete=models.CASCADE
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField()
+
+    @staticmethod
+    def digest(key):
+        return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+    @classmethod
+    def issue(cls, user):
+        key = secrets.token_hex(20)
+        token = cls.objects.create(
+            key_digest=cls.digest(key),
+            user=user,
+            expires_at=timezone.now() + timedelta(seconds=settings.REVIEWS_TOKEN_LIFETIME)
+        )
+        return token, key
+
+    def is_expired(self):
+        return self.expires_at <= timezone.now()
+
+    def __str__(self):
+        return '{} ({})'.format(self.user, self.expires_at)
+
+
+RATINGS = range(0, 6)
+SUBMISSION_ERRORS = (DatabaseError, TypeError, ValueError)
+
+
+class CompanyRatingManager(models.Manager):
+    def add(self, company, rating, delta=1):
+        field = 'rating_{}'.format(rating)
+        values = {
+            'review_count': F('review_count') + delta,
+            'rating_sum': F('rating_sum') + delta * rating,
+            field: F(field) + delta,
+        }
+        if self.filter(company=company).update(**values):
+            return
+        try:
+            with transaction.atomic():
+                self.create(company=company, review_count=delta, rating_sum=delta * rating, **{field: delta})
+        except IntegrityError:
+            self.filter(company=company).update(**values)
+
+    def add_reviews(self, reviews, delta=1):
+        counts = {}
+        for review in reviews:
+            key = (review.company, review.rating)
+            counts[key] = counts.get(key, 0) + 1
+        for (company, rating), count in counts.items():
+            self.add(company, rating, delta * count)
+
+    def rebuild(self):
+        ratings = {}
+        rows = [
+            row
+            for model in (Review, ArchivedReview)
+            for row in model.objects.values('company', 'rating').annotate(count=Count('id')).order_by()
+        ]
+        for row in rows:
+            company_rating = ratings.setdefault(row['company'], self.model(company=row['company']))
+            company_rating.review_count += row['count']
+            company_rating.rating_sum += row['count'] * row['rating']
+            field = 'rating_{}'.format(row['rating'])
+            setattr(company_rating, field, getattr(company_rating, field) + row['count'])
+        with transaction.atomic():
+            self.all().delete()
+            self.bulk_create(ratings.values())
+        return len(ratings)
+
+
+class CompanyRating(models.Model):
+    company = models.CharField(max_length=24, unique=True)
+    review_count = models.PositiveIntegerField(default=0)
+    rating_sum = models.PositiveIntegerField(default=0)
+    rating_0 = models.PositiveIntegerField(default=0)
+    rating_1 = models.PositiveIntegerField(default=0)
+    rating_2 = models.PositiveIntegerField(default=0)
+    rating_3 = models.PositiveIntegerField(default=0)
+    rating_4 = models.PositiveIntegerField(default=0)
+    rating_5 = models.PositiveIntegerField(default=0)
+
+    objects = CompanyRatingManager()
+
+    @property
+    def average_rating(self):
+        if not self.review_count:
+            return None
+        return self.rating_sum / self.review_count
+
+    @property
+    def distribution(self):
+        return {str(rating): getattr(self, 'rating_{}'.format(rating)) for rating in RATINGS}
+
+    def __str__(self):
+        return self.company
+
+
+class UserReviewStatsManager(models.Manager):
+    def add(self, user_id, rating, delta=1):
+        self._add(user_id, delta, delta * rating)
+
+    def add_reviews(self, reviews, delta=1):
+        counts = {}
+        for review in reviews:
+            count, rating_sum = counts.get(review.user_id, (0, 0))
+            counts[review.user_id] = (count + 1, rating_sum + review.rating)
+        for user_id, (count, rating_sum) in counts.items():
+            self._add(user_id, delta * count, delta * rating_sum)
+
+    def _add(self, user_id, count, rating_sum):
+        values = {
+            'review_count': F('review_count') + count,
+            'rating_sum': F('rating_sum') + rating_sum,
+        }
+        if self.filter(user_id=user_id).update(**values):
+            return
+        try:
+            with transaction.atomic():
+                self.create(user_id=user_id, review_count=count, rating_sum=rating_sum)
+        except IntegrityError:
+            self.filter(user_id=user_id).update(**values)
+
+    def reconcile(self, user_ids):
+        repaired = 0
+        with transaction.atomic():
+            stats = {
+                row.user_id: row
+                for row in self.select_for_update().filter(user_id__in=user_ids).order_by('user_id')
+            }
+            actual = {}
+            for model in (Review, ArchivedReview):
+                rows = model.objects.filter(user_id__in=user_ids).values('user_id').annotate(
+                    count=Count('id'), rating_sum=Sum('rating')
+                ).order_by()
+                for row in rows:
+                    count, rating_sum = actual.get(row['user_id'], (0, 0))
+                    actual[row['user_id']] = (count + row['count'], rating_sum + row['rating_sum'])
+            for user_id in user_ids:
+                count, rating_sum = actual.get(user_id, (0, 0))
+                row = stats.get(user_id)
+                if row is None:
+                    if count:
+                        self.create(user_id=user_id, review_count=count, rating_sum=rating_sum)
+                        repaired += 1
+                elif (row.review_count, row.rating_sum) != (count, rating_sum):
+                    self.filter(user_id=user_id).update(review_count=count, rating_sum=rating_sum)
+                    repaired += 1
+        return repaired
+
+
+class UserReviewStats(models.Model):
+    user = models.OneToOneField(
+        'auth.User',
+        related_name='review_stats',
+        primary_key=True,
+        on_delete=models.CASCADE
+    )
+    review_count = models.PositiveIntegerField(default=0)
+    rating_sum = models.PositiveIntegerField(default=0)
+
+    objects = UserReviewStatsManager()
+
+    @property
+    def average_rating(self):
+        if not self.review_count:
+            return None
+        return self.rating_sum / self.review_count
+
+    def __str__(self):
+        return str(self.user)
+
+
+class ReviewSubmissionManager(models.Manager):
+    def drain(self, batch_size):
+        features = connection.features
+        with transaction.atomic():
+            batch = list(
+                self.select_for_update(skip_locked=features.has_select_for_update_skip_locked)
+                .filter(status=ReviewSubmission.PENDING)
+                .order_by('id')[:batch_size]
+            )
+            if not batch:
+                return 0
+
+            try:
+                with transaction.atomic():
+                    reviews = Review.objects.create_many([submission.to_review() for submission in batch])
+                done, failed = list(zip(batch, reviews)), []
+            except SUBMISSION_ERRORS:
+                done, failed = self._create_each(batch)
+
+            now = timezone.now()
+            if done:
+                self.filter(id__in=[submission.id for submission, _ in done]).update(
+                    status=ReviewSubmission.DONE,
+                    processed_at=now,
+                    review_id=Case(
+                        *[When(id=submission.id, then=Value(review.id)) for submission, review in done],
+                        output_field=IntegerField()
+                    )
+                )
+            for submission, error in failed:
+                self.filter(id=submission.id).update(status=ReviewSubmission.FAILED, processed_at=now, error=error)
+
+        for user_id in {submission.user_id for submission, _ in done}:
+            bump_list_version(user_id)
+        return len(batch)
+
+    def _create_each(self, batch):
+        done, failed = [], []
+        for submission in batch:
+            try:
+                with transaction.atomic():
+                    review = submission.to_review()
+                    review.save()
+            except SUBMISSION_ERRORS as error:
+                failed.append((submission, str(error)))
+            else:
+                done.append((submission, review))
+        return done, failed
+
+
+class ReviewSubmission(models.Model):
+    PENDING = 'pending'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (PENDING, 'Pending'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    )
+
+    tracking_id = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    user = models.ForeignKey(
+        'auth.User',
+        related_name='review_submissions',
+        on_delete=models.CASCADE
+    )
+    payload = models.TextField()
+    status = models.CharField(max_length=8, choices=STATUS_CHOICES, default=PENDING)
+    review = models.ForeignKey(
+        Review,
+        related_name='+',
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+    error = models.TextField(blank=True)
+
+    objects = ReviewSubmissionManager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'id'], name='api_submission_status_idx'),
+        ]
+
+    def __str__(self):
+        return str(self.tracking_id)
+
+    def to_review(self):
+        return Review(user_id=self.user_id, **json.loads(self.payload))
+
+
+class ImportCheckpoint(models.Model):
+    name = models.CharField(max_length=1024, unique=True)
+    rows = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.name
+
+
+class IdempotencyKey(models.Model):
+    IN_FLIGHT = 'in_flight'
+    DONE = 'done'
+    STATUS_CHOICES = (
+        (IN_FLIGHT, 'In flight'),
+        (DONE, 'Done'),
+    )
+
+    user = models.ForeignKey(
+        'auth.User',
+        related_name='idempotency_keys',
+        on_delete=models.CASCADE
+    )
+    key = models.CharField(max_length=255)
+    fingerprint = models.CharField(max_length=64)
+    status = models.CharField(max_length=9, choices=STATUS_CHOICES, default=IN_FLIGHT)
+    response_status = models.PositiveSmallIntegerField(null=True, blank=True)
+    response_body = models.TextField(blank=True)
+    created_at = models.DateTimeField()
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        unique_together = (('user', 'key'),)
+
+    def __str__(self):
+        return self.key
+
+
+class ArchivedReview(models.Model):
+    id = models.IntegerField(primary_key=True)
+    title = models.CharField(max_length=64)
+    summary = models.CharField(max_length=10000)
+    rating = models.PositiveIntegerField()
+    ip_address = models.GenericIPAddressField()
+    company = models.CharField(max_length=24)
+    reviewer = models.CharField(max_length=24)
+    user = models.ForeignKey(
+        'auth.User',
+        related_name='archived_reviews',
+        on_delete=models.CASCADE
+    )
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.title
+
+
+class ReviewTombstone(models.Model):
+    review_id = models.IntegerField()
+    user_id = models.IntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user_id', 'deleted_at', 'id'], name='api_tombstone_user_deleted_idx'),
+        ]
+
+    def __str__(self):
+        return str(self.review_id)
@@ -0,0 +1,131 @@
+import binascii
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class ReviewCursorPagination(BasePagination):
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    ordering_query_param = 'ordering'
+    default_ordering = '-created_at'
+    orderings = OrderedDict([
+        ('-created_at', ('-created_at', '-id')),
+        ('created_at', ('created_at', 'id')),
+        ('-rating', ('-rating', '-created_at', '-id')),
+        ('rating', ('rating', 'created_at', 'id')),
+    ])
+    invalid_cursor_message = 'Invalid cursor'
+
+    def get_page_size(self, request):
+        page_size = settings.REVIEWS_PAGE_SIZE
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            pass
+        return max(1, min(page_size, settings.REVIEWS_MAX_PAGE_SIZE))
+
+    def get_ordering(self, request):
+        ordering = request.query_params.get(self.ordering_query_param, self.default_ordering)
+        if ordering not in self.orderings:
+            raise ValidationError({self.ordering_query_param: ['Expected one of: {}.'.format(
+                ', '.join(self.orderings)
+            )]})
+        return self.orderings[ordering]
+
+    def encode_cursor(self, review):
+        values = []
+        for field in self.ordering:
+            value = getattr(review, field.lstrip('-'))
+            values.append(value.isoformat() if field.lstrip('-') == 'created_at' else str(value))
+        return urlsafe_b64encode('|'.join(values).encode('ascii')).decode('ascii')
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            values = urlsafe_b64decode(encoded.encode('ascii')).decode('ascii').split('|')
+            if len(values) != len(self.ordering):
+                raise ValueError
+            position = []
+            for field, value in zip(self.ordering, values):
+                value = parse_datetime(value) if field.lstrip('-') == 'created_at' else int(value)
+                if value is None:
+                    raise ValueError
+                position.append(value)
+        except (binascii.Error, UnicodeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        return position
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(request)
+
+        queryset = queryset.order_by(*self.ordering)
+        position = self.decode_cursor(request)
+        if position is not None:
+            queryset = queryset.filter(self._after(position))
+
+        results = list(queryset[:self.page_size + 1])
+        self.has_next = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        return self.page
+
+    def _after(self, position):
+        first = self.ordering[0]
+        q = Q(**{'{}__{}'.format(first.lstrip('-'), 'lte' if first.startswith('-') else 'gte'): position[0]})
+        after = Q()
+        for i, field in enumerate(self.ordering):
+            lookup = '{}__{}'.format(field.lstrip('-'), 'lt' if field.startswith('-') else 'gt')
+            condition = Q(**{lookup: position[i]})
+            for previous, value in zip(self.ordering[:i], position[:i]):
+                condition &= Q(**{previous.lstrip('-'): value})
+            after |= condition
+        return q & after
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page[-1]))
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('results', data),
+        ]))
+
+
+class EstimatedCountPaginator(Paginator):
+    @cached_property
+    def count(self):
+        estimate = self.estimate()
+        if estimate is not None and estimate >= settings.REVIEWS_ADMIN_EXACT_COUNT_THRESHOLD:
+            return estimate
+        return super().count
+
+    def estimate(self):
+        queryset = self.object_list
+        connection = connections[queryset.db]
+        if connection.vendor != 'postgresql':
+            return None
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN (FORMAT JSON) ' + sql, params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]['Plan']['Plan Rows'])
@@ -0,0 +1,66 @@
+import json
+import os
+import random
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core import signing
+
+HEADER = 'HTTP_X_PROFILE'
+SALT = 'api.profiling'
+
+
+def make_token():
+    return signing.dumps('profile', salt=SALT)
+
+
+def is_valid_token(token):
+    try:
+        return signing.loads(token, salt=SALT, max_age=settings.REVIEWS_PROFILE_TOKEN_MAX_AGE) == 'profile'
+    except signing.BadSignature:
+        return False
+
+
+def should_profile(request):
+    token = request.META.get(HEADER)
+    if token:
+        return is_valid_token(token)
+    return random.random() < settings.REVIEWS_PROFILE_SAMPLE_RATE
+
+
+def write_profile(profiler, tags, directory=None, keep=None):
+    directory = directory or settings.REVIEWS_PROFILE_DIR
+    os.makedirs(directory, exist_ok=True)
+    name = '{:.6f}-{}'.format(time.time(), os.getpid())
+    path = os.path.join(directory, name)
+    profiler.dump_stats(path + '.prof')
+    with open(path + '.json', 'w') as f:
+        json.dump(tags, f)
+    rotate(directory, settings.REVIEWS_PROFILE_KEEP if keep is None else keep)
+    return name
+
+
+def rotate(directory, keep):
+    names = sorted(name[:-len('.prof')] for name in os.listdir(directory) if name.endswith('.prof'))
+    for name in names[:max(0, len(names) - keep)]:
+        for extension in ('.prof', '.json'):
+            try:
+                os.remove(os.path.join(directory, name + extension))
+            except FileNotFoundError:
+                pass
+
+
+def load_profiles(directory=None):
+    directory = directory or settings.REVIEWS_PROFILE_DIR
+    profiles = defaultdict(list)
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith('.json'):
+            continue
+        path = os.path.join(directory, name[:-len('.json')])
+        if not os.path.exists(path + '.prof'):
+            continue
+        with open(path + '.json') as f:
+            tags = json.load(f)
+        profiles[tags['view']].append((path + '.prof', tags))
+    return profiles
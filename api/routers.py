@@ -0,0 +1,139 @@
+import threading
+import time
+from itertools import count
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+PRIMARY_MODELS = ('api.authtoken', 'auth.user', 'sessions.session')
+PIN_KEY = 'api:primary-pin:{}'
+PIN_COOKIE = 'reviews_primary_pin'
+PIN_SALT = 'api.routers'
+
+_state = threading.local()
+
+
+def pin_user(user_id):
+    cache.set(PIN_KEY.format(user_id), True, settings.REVIEWS_PRIMARY_PIN_SECONDS)
+
+
+def pin_response(response, user_id):
+    response.set_signed_cookie(
+        PIN_COOKIE, str(user_id), salt=PIN_SALT, max_age=settings.REVIEWS_PRIMARY_PIN_SECONDS, httponly=True
+    )
+
+
+def is_pinned(request, user_id):
+    pinned = request.get_signed_cookie(
+        PIN_COOKIE, default=None, salt=PIN_SALT, max_age=settings.REVIEWS_PRIMARY_PIN_SECONDS
+    )
+    return pinned == str(user_id) or cache.get(PIN_KEY.format(user_id)) is not None
+
+
+def set_request(request):
+    _state.request = request
+    _state.pinned = None
+
+
+def clear_request():
+    _state.request = None
+    _state.pinned = None
+
+
+def stream_in_request(request, content):
+    content = iter(content)
+    while True:
+        set_request(request)
+        try:
+            part = next(content)
+        except StopIteration:
+            return
+        finally:
+            clear_request()
+        yield part
+
+
+def use_primary():
+    request = getattr(_state, 'request', None)
+    if request is None or request.method not in SAFE_METHODS:
+        return True
+    if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+        return True
+    if _state.pinned is not None:
+        return _state.pinned
+    if getattr(_state, 'resolving', False):
+        return True
+
+    _state.resolving = True
+    try:
+        user = getattr(request, 'user', None)
+        if user is None or not user.is_authenticated:
+            return False
+        _state.pinned = is_pinned(request, user.id)
+        return _state.pinned
+    finally:
+        _state.resolving = False
+
+
+class ReplicaPool:
+    def __init__(self):
+        self._counter = count()
+        self._ejected = {}
+        self._checked = {}
+        self._lock = threading.Lock()
+
+    def is_healthy(self, alias):
+        now = time.monotonic()
+        with self._lock:
+            if self._ejected.get(alias, 0) > now:
+                return False
+            if self._checked.get(alias, 0) > now:
+                return True
+            self._checked[alias] = now + settings.REVIEWS_REPLICA_HEALTH_INTERVAL
+        if self.check(alias):
+            return True
+        self.eject(alias)
+        return False
+
+    def check(self, alias):
+        connection = connections[alias]
+        try:
+            connection.ensure_connection()
+            return connection.is_usable()
+        except DatabaseError:
+            return False
+
+    def eject(self, alias):
+        with self._lock:
+            self._ejected[alias] = time.monotonic() + settings.REVIEWS_REPLICA_EJECT_SECONDS
+            self._checked.pop(alias, None)
+
+    def choose(self):
+        replicas = settings.REVIEWS_READ_REPLICAS
+        start = next(self._counter)
+        for i in range(len(replicas)):
+            alias = replicas[(start + i) % len(replicas)]
+            if self.is_healthy(alias):
+                return alias
+        return DEFAULT_DB_ALIAS
+
+
+replicas = ReplicaPool()
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if not settings.REVIEWS_READ_REPLICAS or model._meta.label_lower in PRIMARY_MODELS or use_primary():
+            return DEFAULT_DB_ALIAS
+        return replicas.choose()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in settings.REVIEWS_READ_REPLICAS
@@ -0,0 +1,19 @@
+from django.db import connections
+from django.db.models import BooleanField, Q
+from django.db.models.expressions import RawSQL
+
+SEARCH_VECTOR_SQL = "\"api_review\".\"search_vector\" @@ plainto_tsquery('pg_catalog.english', %s)"
+
+
+def search_reviews(queryset, query):
+    query = query.strip()
+    if not query:
+        return queryset
+
+    prefix = Q(company__istartswith=query) | Q(reviewer__istartswith=query)
+    if connections[queryset.db].vendor == 'postgresql':
+        queryset = queryset.annotate(
+            search_match=RawSQL(SEARCH_VECTOR_SQL, [query], output_field=BooleanField())
+        )
+        return queryset.filter(Q(search_match=True) | prefix)
+    return queryset.filter(Q(title__icontains=query) | Q(body__summary__icontains=query) | prefix)
@@ -1,10 +1,25 @@
 from rest_framework import serializers
 
-from api.models import Review
+from api.models import CompanyRating, Review, ReviewSubmission, UserReviewStats
 
 
 class ReviewSerializer(serializers.ModelSerializer):
     user = serializers.ReadOnlyField(source='user.username')
+    summary = serializers.CharField(max_length=10000)
+
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            if 'excerpt' in fields:
+                self.fields['excerpt'] = serializers.CharField(read_only=True)
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+    @classmethod
+    def readable_fields(cls):
+        fields = [name for name, field in cls().fields.items() if not field.write_only]
+        return fields + ['excerpt']
 
     def validate_rating(self, value):
         if value < 0 or value > 5:
@@ -13,5 +28,30 @@ class ReviewSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Review
-        fields = '__all__'
+        fields = ('id', 'user', 'title', 'summary', 'rating', 'ip_address', 'company', 'reviewer', 'created_at')
         extra_kwargs = {'ip_address': {'write_only': True}}
+
+
+class CompanyRatingSerializer(serializers.ModelSerializer):
+    average_rating = serializers.FloatField(read_only=True)
+    distribution = serializers.DictField(child=serializers.IntegerField(), read_only=True)
+
+    class Meta:
+        model = CompanyRating
+        fields = ('company', 'review_count', 'average_rating', 'distribution')
+
+
+class UserReviewStatsSerializer(serializers.ModelSerializer):
+    average_rating = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = UserReviewStats
+        fields = ('review_count', 'average_rating')
+
+
+class ReviewSubmissionSerializer(serializers.ModelSerializer):
+    id = serializers.UUIDField(source='tracking_id', read_only=True)
+
+    class Meta:
+        model = ReviewSubmission
+        fields = ('id', 'status', 'review', 'error', 'created_at', 'processed_at')
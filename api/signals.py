@@ -0,0 +1,63 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from api.cache import bump_list_version
+from api.models import CompanyRating, Review, ReviewTombstone, UserReviewStats
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def invalidate_review_list(sender, instance, **kwargs):
+    bump_list_version(instance.user_id)
+    transaction.on_commit(lambda: bump_list_version(instance.user_id))
+
+
+@receiver(pre_save, sender=Review)
+def remember_company_rating(sender, instance, **kwargs):
+    instance._company_rating_before = None
+    instance._user_stats_before = None
+    if instance.pk is not None and not instance._state.adding:
+        before = Review.objects.select_for_update().filter(
+            pk=instance.pk
+        ).values_list('company', 'rating', 'user_id').first()
+        if before is not None:
+            instance._company_rating_before = before[:2]
+            instance._user_stats_before = (before[2], before[1])
+
+
+@receiver(post_save, sender=Review)
+def update_company_rating_on_save(sender, instance, **kwargs):
+    before = getattr(instance, '_company_rating_before', None)
+    after = (instance.company, instance.rating)
+    if before == after:
+        return
+    if before is not None:
+        CompanyRating.objects.add(*before, delta=-1)
+    CompanyRating.objects.add(*after)
+
+
+@receiver(post_delete, sender=Review)
+def update_company_rating_on_delete(sender, instance, **kwargs):
+    CompanyRating.objects.add(instance.company, instance.rating, delta=-1)
+
+
+@receiver(post_save, sender=Review)
+def update_user_stats_on_save(sender, instance, **kwargs):
+    before = getattr(instance, '_user_stats_before', None)
+    after = (instance.user_id, instance.rating)
+    if before == after:
+        return
+    if before is not None:
+        UserReviewStats.objects.add(*before, delta=-1)
+    UserReviewStats.objects.add(*after)
+
+
+@receiver(post_delete, sender=Review)
+def update_user_stats_on_delete(sender, instance, **kwargs):
+    UserReviewStats.objects.add(instance.user_id, instance.rating, delta=-1)
+
+
+@receiver(post_delete, sender=Review)
+def record_tombstone(sender, instance, **kwargs):
+    ReviewTombstone.objects.create(review_id=instance.id, user_id=instance.user_id)
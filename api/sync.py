@@ -0,0 +1,73 @@
+import binascii
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from api.models import Review, ReviewTombstone
+from api.serializers import ReviewSerializer
+
+EPOCH = timezone.make_aware(datetime(1970, 1, 1), timezone.utc)
+
+
+def encode_token(reviews, tombstones):
+    position = '|'.join('{}|{}'.format(ts.isoformat(), pk) for ts, pk in (reviews, tombstones))
+    return urlsafe_b64encode(position.encode('ascii')).decode('ascii')
+
+
+def decode_token(token):
+    try:
+        values = urlsafe_b64decode(token.encode('ascii')).decode('ascii').split('|')
+        if len(values) != 4:
+            raise ValueError
+        reviews = (parse_datetime(values[0]), int(values[1]))
+        tombstones = (parse_datetime(values[2]), int(values[3]))
+    except (binascii.Error, UnicodeError, ValueError):
+        raise ValueError('Invalid sync token.')
+    if reviews[0] is None or tombstones[0] is None:
+        raise ValueError('Invalid sync token.')
+    return reviews, tombstones
+
+
+def is_expired(tombstones):
+    return tombstones[0] < timezone.now() - timedelta(seconds=settings.REVIEWS_SYNC_TOMBSTONE_TTL)
+
+
+def _after(queryset, field, position, bound, limit):
+    ts, pk = position
+    queryset = queryset.filter(
+        Q(**{field + '__gt': ts}) | Q(**{field: ts, 'id__gt': pk}),
+        **{field + '__gte': ts, field + '__lte': bound}
+    ).order_by(field, 'id')
+    rows = list(queryset[:limit + 1])
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, (getattr(rows[-1], field), rows[-1].id), True
+    return rows, (bound, 0), False
+
+
+def changes_since(user, token, limit):
+    bound = timezone.now() - timedelta(seconds=settings.REVIEWS_SYNC_SETTLE_SECONDS)
+    if token:
+        reviews_position, tombstones_position = decode_token(token)
+    else:
+        reviews_position, tombstones_position = (EPOCH, 0), (bound, 0)
+
+    reviews, reviews_position, more_reviews = _after(
+        Review.objects.filter(user=user).select_related('user', 'body'), 'created_at',
+        reviews_position, bound, limit
+    )
+    tombstones, tombstones_position, more_tombstones = _after(
+        ReviewTombstone.objects.filter(user_id=user.id), 'deleted_at',
+        tombstones_position, bound, limit
+    )
+    return OrderedDict([
+        ('token', encode_token(reviews_position, tombstones_position)),
+        ('more', more_reviews or more_tombstones),
+        ('changed', ReviewSerializer(reviews, many=True).data),
+        ('deleted', [tombstone.review_id for tombstone in tombstones]),
+    ])
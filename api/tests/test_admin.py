@@ -0,0 +1,76 @@
+from unittest import mock, skipIf
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
+
+from api.models import CompanyRating, Review
+from api.pagination import EstimatedCountPaginator
+
+
+class ReviewAdminTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(
+            'admin',
+            'admin@example.com',
+            'admin_pwd'
+        )
+        self.client.force_login(self.admin)
+
+        for rating in (1, 4, 4):
+            Review.objects.create(
+                title='My review',
+                summary='This is my first review.',
+                rating=rating,
+                ip_address='127.0.0.1',
+                company='Some Company',
+                reviewer='Some Reviewer',
+                user=self.admin,
+            )
+
+    def test_changelist(self):
+        response = self.client.get('/admin/api/review/', {'rating__exact': 4})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['cl'].result_count, 2)
+        self.assertEqual(response.context['cl'].full_result_count, None)
+
+    def test_delete_reviews_action(self):
+        ids = Review.objects.filter(rating=4).values_list('id', flat=True)
+        response = self.client.post('/admin/api/review/', {
+            'action': 'delete_reviews',
+            '_selected_action': list(ids),
+        })
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Review.objects.count(), 1)
+        self.assertEqual(CompanyRating.objects.get(company='Some Company').review_count, 1)
+
+
+class EstimatedCountPaginatorTests(TestCase):
+    def test_exact_count_without_estimate(self):
+        paginator = EstimatedCountPaginator(Review.objects.all(), 50)
+
+        with mock.patch.object(EstimatedCountPaginator, 'estimate', return_value=None):
+            self.assertEqual(paginator.count, 0)
+
+    @skipIf(connection.vendor == 'postgresql', 'PostgreSQL returns a planner estimate')
+    def test_no_estimate_without_postgresql(self):
+        paginator = EstimatedCountPaginator(Review.objects.all(), 50)
+
+        self.assertIsNone(paginator.estimate())
+
+    @override_settings(REVIEWS_ADMIN_EXACT_COUNT_THRESHOLD=1000)
+    def test_estimate_above_threshold(self):
+        paginator = EstimatedCountPaginator(Review.objects.all(), 50)
+
+        with mock.patch.object(EstimatedCountPaginator, 'estimate', return_value=25000):
+            self.assertEqual(paginator.count, 25000)
+            self.assertEqual(paginator.num_pages, 500)
+
+    @override_settings(REVIEWS_ADMIN_EXACT_COUNT_THRESHOLD=1000)
+    def test_exact_count_below_threshold(self):
+        paginator = EstimatedCountPaginator(Review.objects.all(), 50)
+
+        with mock.patch.object(EstimatedCountPaginator, 'estimate', return_value=10):
+            self.assertEqual(paginator.count, 0)
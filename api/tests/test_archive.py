@@ -0,0 +1,71 @@
+from datetime import datetime, timedelta
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.utils import timezone
+
+from api import archive
+from api.models import ArchivedReview, CompanyRating, Review, ReviewTombstone, UserReviewStats
+
+
+class ArchiveTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            'user1',
+            'user1@example.com',
+            'user1_pwd'
+        )
+
+        for i in range(3):
+            Review.objects.create(
+                title='Review {}'.format(i),
+                summary='This is a review.',
+                rating=i,
+                ip_address='127.0.0.1',
+                company='Some Company',
+                reviewer='Some Reviewer',
+                user=self.user,
+            )
+
+    def test_archive_reviews(self):
+        old = timezone.now() - timedelta(days=400)
+        Review.objects.filter(rating__lt=2).update(created_at=old)
+        old_ids = set(Review.objects.filter(rating__lt=2).values_list('id', flat=True))
+
+        count = archive.archive_reviews(timezone.now() - timedelta(days=365), batch_size=1)
+
+        self.assertEqual(count, 2)
+        self.assertEqual(Review.objects.count(), 1)
+        self.assertEqual(set(ArchivedReview.objects.values_list('id', flat=True)), old_ids)
+        self.assertFalse(ReviewTombstone.objects.exists())
+
+        archived = ArchivedReview.objects.get(rating=1)
+
+        self.assertEqual(archived.title, 'Review 1')
+        self.assertEqual(archived.user, self.user)
+        self.assertEqual(archived.created_at, old)
+
+        company_rating = CompanyRating.objects.get(company='Some Company')
+
+        self.assertEqual(company_rating.review_count, 3)
+        self.assertEqual(company_rating.rating_sum, 3)
+
+        stats = UserReviewStats.objects.get(user=self.user)
+
+        self.assertEqual((stats.review_count, stats.rating_sum), (3, 3))
+        self.assertEqual(UserReviewStats.objects.reconcile([self.user.id]), 0)
+
+    def test_archive_nothing(self):
+        self.assertEqual(archive.archive_reviews(timezone.now() - timedelta(days=365), batch_size=10), 0)
+        self.assertEqual(Review.objects.count(), 3)
+
+    def test_add_months(self):
+        start = datetime(2018, 11, 1, tzinfo=timezone.utc)
+
+        self.assertEqual(archive.add_months(start, 1), datetime(2018, 12, 1, tzinfo=timezone.utc))
+        self.assertEqual(archive.add_months(start, 2), datetime(2019, 1, 1, tzinfo=timezone.utc))
+        self.assertEqual(archive.add_months(start, -11), datetime(2017, 12, 1, tzinfo=timezone.utc))
+        self.assertEqual(
+            archive.month_start(datetime(2018, 8, 30, 16, 30, tzinfo=timezone.utc)),
+            datetime(2018, 8, 1, tzinfo=timezone.utc)
+        )
@@ -0,0 +1,95 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework import exceptions
+
+from api.authentication import ExpiringTokenAuthentication, token_cache
+from api.models import AuthToken
+
+
+class ExpiringTokenAuthenticationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            'user1',
+            'user1@example.com',
+            'user1_pwd'
+        )
+        self.token, self.key = AuthToken.issue(self.user)
+        self.authentication = ExpiringTokenAuthentication()
+        token_cache.clear()
+
+    def tearDown(self):
+        token_cache.clear()
+
+    def test_issue_token(self):
+        self.assertEqual(len(self.key), 40)
+        self.assertNotEqual(self.token.key_digest, self.key)
+        self.assertEqual(self.token.key_digest, AuthToken.digest(self.key))
+        self.assertFalse(self.token.is_expired())
+
+    def test_authenticate_token(self):
+        user, token = self.authentication.authenticate_credentials(self.key)
+
+        self.assertEqual(user, self.user)
+        self.assertEqual(token, self.token)
+
+    def test_authenticate_cached_token(self):
+        self.authentication.authenticate_credentials(self.key)
+
+        with self.assertNumQueries(0):
+            user, token = self.authentication.authenticate_credentials(self.key)
+
+        self.assertEqual(user, self.user)
+
+    @override_settings(REVIEWS_TOKEN_CACHE_TTL=0)
+    def test_authenticate_cache_expired(self):
+        self.authentication.authenticate_credentials(self.key)
+
+        with self.assertNumQueries(1):
+            self.authentication.authenticate_credentials(self.key)
+
+    @override_settings(REVIEWS_TOKEN_CACHE_TTL=60)
+    def test_authenticate_revoked_token_after_ttl(self):
+        with mock.patch('api.authentication.time.monotonic', return_value=1000):
+            self.authentication.authenticate_credentials(self.key)
+        AuthToken.objects.filter(pk=self.token.pk).delete()
+
+        for now in (1030, 1059):
+            with mock.patch('api.authentication.time.monotonic', return_value=now):
+                self.authentication.authenticate_credentials(self.key)
+
+        with mock.patch('api.authentication.time.monotonic', return_value=1060):
+            with self.assertRaises(exceptions.AuthenticationFailed):
+                self.authentication.authenticate_credentials(self.key)
+
+    def test_authenticate_invalid_token(self):
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self.authentication.authenticate_credentials('invalid')
+
+    def test_authenticate_expired_token(self):
+        self.authentication.authenticate_credentials(self.key)
+        self.token.expires_at = timezone.now() - timedelta(seconds=1)
+        token_cache.set(self.token.key_digest, self.token)
+
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self.authentication.authenticate_credentials(self.key)
+        self.assertIsNone(token_cache.get(self.token.key_digest))
+
+    def test_authenticate_inactive_user(self):
+        self.user.is_active = False
+        self.user.save()
+
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self.authentication.authenticate_credentials(self.key)
+
+    @override_settings(REVIEWS_TOKEN_CACHE_SIZE=1)
+    def test_cache_size_bounded(self):
+        other_token, other_key = AuthToken.issue(self.user)
+        self.authentication.authenticate_credentials(self.key)
+        self.authentication.authenticate_credentials(other_key)
+
+        self.assertIsNone(token_cache.get(self.token.key_digest))
+        self.assertIsNotNone(token_cache.get(other_token.key_digest))
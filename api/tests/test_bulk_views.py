@@ -0,0 +1,105 @@
+import json
+
+from django.contrib.auth.models import User
+from django.core.handlers.wsgi import WSGIRequest
+from django.test import TestCase, override_settings
+from django.test.client import FakePayload
+from rest_framework import status
+from rest_framework.views import APIView
+
+from api.cache import get_list_version
+from api.models import CompanyRating, Review
+from api.views import ReviewBulkCreateView
+
+
+class TestReviewBulkCreateView(TestCase):
+    def setUp(self):
+        self.user_john = User.objects.create_user(
+            'john',
+            'john@example.com',
+            'john_pwd'
+        )
+
+        self.data = {
+            'title': 'My review',
+            'summary': 'This is my first review.',
+            'rating': 1,
+            'company': 'Some Company',
+            'reviewer': 'Some Reviewer'
+        }
+
+        self.view = ReviewBulkCreateView()
+
+    def _prepare_post_request(self, data, user=None):
+        payload = FakePayload(json.dumps(data))
+        request = WSGIRequest({
+            'REQUEST_METHOD': 'POST',
+            'REMOTE_ADDR': '127.0.0.1',
+            'CONTENT_TYPE': 'application/json',
+            'CONTENT_LENGTH': '{}'.format(len(payload)),
+            'wsgi.input': payload
+        })
+        if user:
+            request.user = user
+        request._dont_enforce_csrf_checks = True
+        return request
+
+    def test_post_reviews(self):
+        request = self._prepare_post_request([self.data, dict(self.data, rating=5)], self.user_john)
+        response = self.view.dispatch(request)
+
+        self.assertIsInstance(self.view, APIView)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        data = response.data
+
+        self.assertEqual(len(data), 2)
+        self.assertEqual(data[0].get('user'), 'john')
+        self.assertEqual(data[1].get('rating'), 5)
+        self.assertFalse('ip_address' in data[0])
+        self.assertEqual(Review.objects.filter(user=self.user_john).count(), 2)
+        self.assertEqual(Review.objects.filter(ip_address='127.0.0.1').count(), 2)
+        self.assertEqual(CompanyRating.objects.get(company='Some Company').rating_sum, 6)
+
+    def test_post_reviews_invalidates_list(self):
+        version = get_list_version(self.user_john.id)
+
+        request = self._prepare_post_request([self.data], self.user_john)
+        self.view.dispatch(request)
+
+        self.assertNotEqual(get_list_version(self.user_john.id), version)
+
+    def test_post_reviews_invalid_item(self):
+        request = self._prepare_post_request([self.data, dict(self.data, rating=6)], self.user_john)
+        response = self.view.dispatch(request)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        errors = response.data
+
+        self.assertEqual(len(errors), 2)
+        self.assertEqual(errors[0], {})
+        self.assertEqual(len(errors[1].get('rating')), 1)
+        self.assertEqual(Review.objects.count(), 0)
+
+    def test_post_reviews_not_a_list(self):
+        request = self._prepare_post_request(self.data, self.user_john)
+        response = self.view.dispatch(request)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Review.objects.count(), 0)
+
+    @override_settings(REVIEWS_MAX_BATCH_SIZE=2)
+    def test_post_reviews_batch_too_large(self):
+        request = self._prepare_post_request([self.data] * 3, self.user_john)
+        response = self.view.dispatch(request)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(len(response.data.get('non_field_errors')), 1)
+        self.assertEqual(Review.objects.count(), 0)
+
+    def test_post_reviews_anon_user(self):
+        request = self._prepare_post_request([self.data])
+        response = self.view.dispatch(request)
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,401 @@
+import csv
+import gzip
+import json
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import DatabaseError
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from api import profiling
+from api.models import (
+    ArchivedReview, CompanyRating, IdempotencyKey, ImportCheckpoint, Review, ReviewSubmission,
+    ReviewTombstone, UserReviewStats
+)
+
+
+class RebuildCompanyRatingsCommandTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            'user1',
+            'user1@example.com',
+            'user1_pwd'
+        )
+
+        Review.objects.create(
+            title='My review',
+            summary='This is my first review.',
+            rating=4,
+            ip_address='127.0.0.1',
+            company='Some Company',
+            reviewer='Some Reviewer',
+            user=self.user,
+        )
+
+    def test_rebuild_company_ratings(self):
+        CompanyRating.objects.all().delete()
+        out = StringIO()
+        call_command('rebuild_company_ratings', stdout=out)
+
+        company_rating = CompanyRating.objects.get(company='Some Company')
+
+        self.assertEqual(company_rating.review_count, 1)
+        self.assertEqual(company_rating.rating_4, 1)
+        self.assertIn('1 companies', out.getvalue())
+
+
+class SeedReviewsCommandTests(TestCase):
+    def test_seed_reviews(self):
+        out = StringIO()
+        call_command('seed_reviews', users=2, reviews=6, stdout=out)
+
+        self.assertEqual(User.objects.filter(username__startswith='loadtest_').count(), 2)
+        self.assertEqual(Review.objects.count(), 12)
+        self.assertEqual(CompanyRating.objects.get(company='Company 5').rating_5, 2)
+        self.assertTrue(User.objects.get(username='loadtest_0').check_password('loadtest_pwd'))
+
+        call_command('seed_reviews', users=2, reviews=6, stdout=out)
+
+        self.assertEqual(User.objects.filter(username__startswith='loadtest_').count(), 2)
+        self.assertEqual(Review.objects.count(), 24)
+
+
+class DrainReviewSubmissionsCommandTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            'user1',
+            'user1@example.com',
+            'user1_pwd'
+        )
+
+        payload = json.dumps({
+            'title': 'My review',
+            'summary': 'This is my first review.',
+            'rating': 1,
+            'ip_address': '127.0.0.1',
+            'company': 'Some Company',
+            'reviewer': 'Some Reviewer',
+        })
+        for i in range(3):
+            ReviewSubmission.objects.create(user=self.user, payload=payload)
+
+    def test_drain_review_submissions(self):
+        out = StringIO()
+        call_command('drain_review_submissions', batch_size=2, stdout=out)
+
+        self.assertEqual(Review.objects.count(), 3)
+        self.assertFalse(ReviewSubmission.objects.filter(status=ReviewSubmission.PENDING).exists())
+        self.assertIn('Drained 3 submissions.', out.getvalue())
+
+
+class SweepIdempotencyKeysCommandTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            'user1',
+            'user1@example.com',
+            'user1_pwd'
+        )
+
+        now = timezone.now()
+        for key, expires_at in (('old', now - timedelta(seconds=1)), ('new', now + timedelta(hours=1))):
+            IdempotencyKey.objects.create(
+                user=self.user,
+                key=key,
+                fingerprint='',
+                created_at=now,
+                expires_at=expires_at
+            )
+
+    def test_sweep_idempotency_keys(self):
+        out = StringIO()
+        call_command('sweep_idempotency_keys', stdout=out)
+
+        self.assertEqual(list(IdempotencyKey.objects.values_list('key', flat=True)), ['new'])
+        self.assertIn('Deleted 1 expired', out.getvalue())
+
+
+class ManageReviewPartitionsCommandTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            'user1',
+            'user1@example.com',
+            'user1_pwd'
+        )
+
+        for i in range(2):
+            Review.objects.create(
+                title='My review',
+                summary='This is my first review.',
+                rating=1,
+                ip_address='127.0.0.1',
+                company='Some Company',
+                reviewer='Some Reviewer',
+                user=self.user,
+            )
+
+    def test_manage_review_partitions(self):
+        Review.objects.filter(id=Review.objects.first().id).update(
+            created_at=timezone.now() - timedelta(days=40)
+        )
+
+        out = StringIO()
+        call_command('manage_review_partitions', archive_after_days=30, retention_months=12, stdout=out)
+
+        self.assertEqual(Review.objects.count(), 1)
+        self.assertEqual(ArchivedReview.objects.count(), 1)
+        self.assertIn('Archived 1 reviews.', out.getvalue())
+
+
+class ImportReviewsCommandTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            'user1',
+            'user1@example.com',
+            'user1_pwd'
+        )
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+
+        self.row = {
+            'title': 'My review',
+            'summary': 'This is my first review.',
+            'rating': 4,
+            'company': 'Some Company',
+            'reviewer': 'Some Reviewer',
+            'user': 'user1',
+        }
+
+    def _write(self, name, lines):
+        path = os.path.join(self.tmpdir, name)
+        with open(path, 'w') as f:
+            f.write(''.join(line + '\n' for line in lines))
+        return path
+
+    def test_import_jsonl(self):
+        path = self._write('reviews.jsonl', [
+            json.dumps(self.row),
+            json.dumps(dict(self.row, rating=9)),
+            json.dumps(dict(self.row, user='nobody')),
+            '{not json',
+            json.dumps(dict(self.row, rating=2)),
+            '42',
+            json.dumps(dict(self.row, _error='x')),
+        ])
+
+        out = StringIO()
+        call_command('import_reviews', path, batch_size=2, stdout=out)
+
+        self.assertEqual(self.user.reviews.count(), 3)
+        self.assertEqual(self.user.reviews.get(rating=2).summary, 'This is my first review.')
+        self.assertEqual(CompanyRating.objects.get(company='Some Company').review_count, 3)
+        self.assertIn('Imported 3 reviews, rejected 4.', out.getvalue())
+        self.assertFalse(ImportCheckpoint.objects.exists())
+
+        with open(path + '.rejects') as f:
+            rejects = [json.loads(line) for line in f]
+
+        self.assertEqual([reject['row'] for reject in rejects], [2, 3, 4, 6])
+        self.assertIn('rating', rejects[0]['errors'])
+        self.assertIn('user', rejects[1]['errors'])
+        self.assertEqual(rejects[2]['data'], '{not json')
+        self.assertEqual(rejects[3]['data'], 42)
+
+    def test_import_csv(self):
+        path = self._write('reviews.csv', [
+            'title,summary,rating,company,reviewer',
+            'My review,"Good, really.",5,Some Company,Some Reviewer',
+        ])
+
+        call_command('import_reviews', path, user='user1', stdout=StringIO())
+
+        review = self.user.reviews.get()
+
+        self.assertEqual(review.rating, 5)
+        self.assertEqual(review.summary, 'Good, really.')
+        self.assertEqual(review.ip_address, '127.0.0.1')
+
+    def test_resume_from_checkpoint(self):
+        path = self._write('reviews.jsonl', [
+            json.dumps(dict(self.row, title='First')),
+            json.dumps(dict(self.row, title='Second')),
+        ])
+        ImportCheckpoint.objects.create(name=path, rows=1)
+
+        out = StringIO()
+        call_command('import_reviews', path, stdout=out)
+
+        self.assertEqual(list(self.user.reviews.values_list('title', flat=True)), ['Second'])
+        self.assertIn('Resuming after row 1.', out.getvalue())
+
+    def test_checkpoint_committed_with_chunk(self):
+        path = self._write('reviews.jsonl', [
+            json.dumps(dict(self.row, title='First')),
+            json.dumps(dict(self.row, title='Second')),
+        ])
+
+        with mock.patch.object(Review.objects, 'copy_many', side_effect=[None, DatabaseError('lost')]):
+            with self.assertRaises(DatabaseError):
+                call_command('import_reviews', path, batch_size=1, stdout=StringIO())
+
+        self.assertEqual(ImportCheckpoint.objects.get(name=path).rows, 1)
+
+        out = StringIO()
+        call_command('import_reviews', path, batch_size=1, stdout=out)
+
+        self.assertEqual(list(self.user.reviews.values_list('title', flat=True)), ['Second'])
+        self.assertIn('Resuming after row 1.', out.getvalue())
+
+
+class ExportReviewsCommandTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            'user1',
+            'user1@example.com',
+            'user1_pwd'
+        )
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+
+        self.reviews = [
+            Review.objects.create(
+                title='Review {}'.format(i),
+                summary='This is review {}.'.format(i),
+                rating=i,
+                ip_address='127.0.0.1',
+                company='Company {}'.format(i % 2),
+                reviewer='Some Reviewer',
+                user=self.user,
+            )
+            for i in range(4)
+        ]
+
+    def test_export_jsonl_gzip(self):
+        path = os.path.join(self.tmpdir, 'reviews.jsonl.gz')
+        out = StringIO()
+        call_command('export_reviews', path, chunk_size=2, stdout=out)
+
+        with gzip.open(path, 'rt') as f:
+            rows = [json.loads(line) for line in f]
+
+        self.assertEqual([row['id'] for row in rows], [review.id for review in self.reviews])
+        self.assertEqual(rows[1]['user'], 'user1')
+        self.assertEqual(rows[1]['summary'], 'This is review 1.')
+        self.assertNotIn('ip_address', rows[1])
+        self.assertIn('Exported 4 reviews', out.getvalue())
+
+    def test_export_csv_filters(self):
+        path = os.path.join(self.tmpdir, 'reviews.csv')
+        Review.objects.filter(id=self.reviews[2].id).update(created_at=timezone.now() - timedelta(days=10))
+
+        call_command(
+            'export_reviews', path, company='Company 0', user='user1',
+            since=(timezone.now() - timedelta(days=1)).date().isoformat(), stdout=StringIO()
+        )
+
+        with open(path, newline='') as f:
+            rows = list(csv.DictReader(f))
+
+        self.assertEqual([row['title'] for row in rows], ['Review 0'])
+
+    def test_export_id_range(self):
+        path = os.path.join(self.tmpdir, 'reviews.jsonl')
+        call_command(
+            'export_reviews', path,
+            id_range='{}:{}'.format(self.reviews[1].id, self.reviews[3].id), stdout=StringIO()
+        )
+
+        with open(path) as f:
+            ids = [json.loads(line)['id'] for line in f]
+
+        self.assertEqual(ids, [self.reviews[1].id, self.reviews[2].id])
+
+
+class ProfileReportCommandTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            'user1',
+            'user1@example.com',
+            'user1_pwd'
+        )
+        self.client.force_login(self.user)
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+
+    def test_profile_report(self):
+        with override_settings(REVIEWS_PROFILE_DIR=self.tmpdir, REVIEWS_PROFILE_SAMPLE_RATE=1.0):
+            self.client.get('/api/reviews/')
+            self.client.get('/api/reviews/')
+
+        out = StringIO()
+        call_command('profile_report', dir=self.tmpdir, top=5, stdout=out)
+
+        self.assertIn('api.views.ReviewListView (2 requests', out.getvalue())
+        self.assertEqual(len(out.getvalue().splitlines()), 7)
+
+    def test_no_profiles(self):
+        out = StringIO()
+        call_command('profile_report', dir=self.tmpdir, stdout=out)
+
+        self.assertIn('No profiles found.', out.getvalue())
+
+    def test_profile_token(self):
+        out = StringIO()
+        call_command('profile_token', stdout=out)
+
+        self.assertTrue(profiling.is_valid_token(out.getvalue().strip()))
+
+
+class SweepReviewTombstonesCommandTests(TestCase):
+    def test_sweep_review_tombstones(self):
+        ReviewTombstone.objects.create(review_id=1, user_id=1)
+        ReviewTombstone.objects.create(review_id=2, user_id=1)
+        ReviewTombstone.objects.filter(review_id=1).update(deleted_at=timezone.now() - timedelta(days=60))
+
+        out = StringIO()
+        call_command('sweep_review_tombstones', stdout=out)
+
+        self.assertEqual(list(ReviewTombstone.objects.values_list('review_id', flat=True)), [2])
+        self.assertIn('Deleted 1 review tombstones.', out.getvalue())
+
+
+class ReconcileUserReviewStatsCommandTests(TestCase):
+    def setUp(self):
+        self.users = [
+            User.objects.create_user('user{}'.format(i), 'user{}@example.com'.format(i), 'user_pwd')
+            for i in range(3)
+        ]
+        for user in self.users[:2]:
+            Review.objects.create(
+                title='My review',
+                summary='This is my first review.',
+                rating=4,
+                ip_address='127.0.0.1',
+                company='Some Company',
+                reviewer='Some Reviewer',
+                user=user,
+            )
+
+    def test_reconcile_user_review_stats(self):
+        UserReviewStats.objects.filter(user=self.users[0]).update(review_count=10, rating_sum=3)
+        UserReviewStats.objects.filter(user=self.users[1]).delete()
+        UserReviewStats.objects.create(user=self.users[2], review_count=1, rating_sum=5)
+
+        out = StringIO()
+        call_command('reconcile_user_review_stats', batch_size=2, stdout=out)
+
+        stats = {row.user_id: (row.review_count, row.rating_sum) for row in UserReviewStats.objects.all()}
+
+        self.assertEqual(stats, {self.users[0].id: (1, 4), self.users[1].id: (1, 4), self.users[2].id: (0, 0)})
+        self.assertIn('Repaired review stats for 3 of 3 users.', out.getvalue())
+
+        out = StringIO()
+        call_command('reconcile_user_review_stats', stdout=out)
+
+        self.assertIn('Repaired review stats for 0 of 3 users.', out.getvalue())
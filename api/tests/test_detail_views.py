@@ -2,13 +2,17 @@ from django.contrib.auth.models import User
 from django.core.handlers.wsgi import WSGIRequest
 from django.test import TestCase
 from django.test.client import FakePayload
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.views import APIView
 
-from api.models import Review
+from api.archive import ensure_partitions
+from api.models import ArchivedReview, Review
+from api.tests.utils import QueryBudgetMixin
 from api.views import ReviewDetailView
 
-class TestReviewDetailView(TestCase):
+
+class TestReviewDetailView(QueryBudgetMixin, TestCase):
     def setUp(self):
         self.user_john = User.objects.create_user(
             'john',
@@ -67,6 +71,34 @@ class TestReviewDetailView(TestCase):
         self.assertEqual(data.get('user'), 'john')
         self.assertEqual(Review.objects.count(), 1)
 
+    def test_get_archived_review(self):
+        now = timezone.now()
+        ensure_partitions(now, now)
+        ArchivedReview.objects.create(
+            id=42,
+            title='Old review',
+            summary='This is an old review.',
+            rating=2,
+            ip_address='127.0.0.1',
+            company='Some Company',
+            reviewer='Some Reviewer',
+            user=self.user_john,
+            created_at=now,
+        )
+
+        request = self._prepare_get_request(self.user_john)
+        response = self.view.dispatch(request, pk=42)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data.get('id'), 42)
+        self.assertEqual(response.data.get('title'), 'Old review')
+        self.assertEqual(response.data.get('user'), 'john')
+
+        request = self._prepare_get_request(self.user_fred)
+        response = self.view.dispatch(request, pk=42)
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
     def test_get_review_not_found(self):
         request = self._prepare_get_request(self.user_john)
         response = self.view.dispatch(request, pk=1)
@@ -91,3 +123,12 @@ class TestReviewDetailView(TestCase):
 
         self.assertIsInstance(self.view, APIView)
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_get_review_query_budget(self):
+        self.review_by_john.save()
+
+        request = self._prepare_get_request(self.user_john)
+        with self.assertQueryBudget(1):
+            response = self.view.dispatch(request, pk=self.review_by_john.id)
+
+        self.assertEqual(response.data.get('user'), 'john')
@@ -0,0 +1,99 @@
+import json
+
+from django.contrib.auth.models import User
+from django.core.handlers.wsgi import WSGIRequest
+from django.test import TestCase
+from django.test.client import FakePayload
+from rest_framework import status
+from rest_framework.views import APIView
+
+from api.models import Review
+from api.views import ReviewExportView
+
+
+class TestReviewExportView(TestCase):
+    def setUp(self):
+        self.user_john = User.objects.create_user(
+            'john',
+            'john@example.com',
+            'john_pwd'
+        )
+
+        self.user_fred = User.objects.create_user(
+            'fred',
+            'fred@example.com',
+            'fred_pwd'
+        )
+
+        for user in (self.user_john, self.user_john, self.user_fred):
+            Review.objects.create(
+                title='My review',
+                summary='This is my first review.',
+                rating=1,
+                ip_address='127.0.0.1',
+                company='Some Company',
+                reviewer='Some Reviewer',
+                user=user,
+            )
+
+        self.view = ReviewExportView()
+
+    def _prepare_get_request(self, user=None, query_string=''):
+        payload = FakePayload('')
+        request = WSGIRequest({
+            'REQUEST_METHOD': 'GET',
+            'QUERY_STRING': query_string,
+            'CONTENT_LENGTH': 0,
+            'wsgi.input': payload
+        })
+        if user:
+            request.user = user
+        request._dont_enforce_csrf_checks = True
+        return request
+
+    def _read(self, response):
+        return b''.join(response.streaming_content).decode('utf-8')
+
+    def test_export_reviews(self):
+        request = self._prepare_get_request(self.user_john)
+        response = self.view.dispatch(request)
+
+        self.assertIsInstance(self.view, APIView)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/json')
+
+        data = json.loads(self._read(response))
+
+        self.assertEqual(len(data), 2)
+        self.assertEqual(data[0].get('user'), 'john')
+        self.assertEqual(data[0].get('title'), 'My review')
+        self.assertFalse('ip_address' in data[0])
+        self.assertLess(data[0].get('id'), data[1].get('id'))
+
+    def test_export_zero_reviews(self):
+        Review.objects.all().delete()
+
+        request = self._prepare_get_request(self.user_john)
+        response = self.view.dispatch(request)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(json.loads(self._read(response)), [])
+
+    def test_export_reviews_ndjson(self):
+        request = self._prepare_get_request(self.user_john, 'ndjson=1')
+        response = self.view.dispatch(request)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+
+        lines = self._read(response).splitlines()
+
+        self.assertEqual(len(lines), 2)
+        self.assertEqual(json.loads(lines[0]).get('user'), 'john')
+
+    def test_export_reviews_anon_user(self):
+        request = self._prepare_get_request()
+        response = self.view.dispatch(request)
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
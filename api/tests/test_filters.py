@@ -0,0 +1,80 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from api.models import Review
+
+
+class ReviewListIndexTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            'user1',
+            'user1@example.com',
+            'user1_pwd'
+        )
+        self.client.force_login(self.user)
+
+        users = [self.user] + [
+            User.objects.create_user('user{}'.format(i), 'user{}@example.com'.format(i), 'user_pwd')
+            for i in range(2, 21)
+        ]
+        Review.objects.bulk_create([
+            Review(
+                title='My review',
+                summary='This is my first review.',
+                rating=i % 6,
+                ip_address='127.0.0.1',
+                company='Company {}'.format(i % 10),
+                reviewer='Reviewer {}'.format(i % 10),
+                user=user,
+            )
+            for user in users
+            for i in range(100)
+        ])
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE api_review')
+
+    def _explain(self, query_string):
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/reviews/?' + query_string)
+        self.assertEqual(response.status_code, 200)
+
+        sql = [query['sql'] for query in queries if 'FROM "api_review"' in query['sql']][-1]
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute('SET LOCAL enable_seqscan = off')
+                cursor.execute('SET LOCAL enable_sort = off')
+                cursor.execute('EXPLAIN ' + sql)
+            else:
+                cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+            return '\n'.join(str(row) for row in cursor.fetchall())
+
+    def test_index_per_filter(self):
+        now = timezone.now()
+        created_range = 'created_after={}&created_before={}'.format(
+            (now - timedelta(days=1)).strftime('%Y-%m-%dT%H:%M:%SZ'),
+            (now + timedelta(days=1)).strftime('%Y-%m-%dT%H:%M:%SZ'),
+        )
+        combinations = [
+            ('', ('api_review_user_created_idx',)),
+            ('ordering=created_at', ('api_review_user_created_idx',)),
+            (created_range, ('api_review_user_created_idx',)),
+            ('rating_min=2&rating_max=4', ('api_review_user_created_idx', 'api_review_user_rating_idx')),
+            ('ordering=-rating', ('api_review_user_rating_idx',)),
+            ('rating_min=4&ordering=rating', ('api_review_user_rating_idx',)),
+            ('company=Company+1', ('api_review_user_company_idx',)),
+            ('reviewer=Reviewer+1', ('api_review_user_reviewer_idx',)),
+        ]
+        for query_string, indexes in combinations:
+            with self.subTest(query_string=query_string):
+                plan = self._explain(query_string)
+                self.assertTrue(any(index in plan for index in indexes), plan)
+                if connection.vendor == 'postgresql':
+                    self.assertNotIn('Sort', plan)
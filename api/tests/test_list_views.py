@@ -1,15 +1,21 @@
+from datetime import timedelta
+from urllib.parse import urlparse
+
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.core.handlers.wsgi import WSGIRequest
-from django.test import TestCase
+from django.test import TestCase, override_settings
+from django.utils import timezone
 from django.test.client import FakePayload
 from rest_framework import status
 from rest_framework.views import APIView
 
-from api.models import Review
+from api.models import IdempotencyKey, Review, ReviewSubmission
+from api.tests.utils import QueryBudgetMixin
 from api.views import ReviewListView
 
 
-class TestReviewListView(TestCase):
+class TestReviewListView(QueryBudgetMixin, TestCase):
     def setUp(self):
         self.user_john = User.objects.create_user(
             'john',
@@ -53,6 +59,8 @@ class TestReviewListView(TestCase):
 
         self.view = ReviewListView()
 
+        cache.clear()
+
     def _prepare_post_request(self, data, user=None):
         payload_content = '''
         {{
@@ -77,13 +85,16 @@ class TestReviewListView(TestCase):
         request._dont_enforce_csrf_checks = True
         return request
 
-    def _prepare_get_request(self, user=None):
+    def _prepare_get_request(self, user=None, query_string='', **extra):
         payload = FakePayload('')
-        request = WSGIRequest({
+        request = WSGIRequest(dict({
             'REQUEST_METHOD': 'GET',
+            'SERVER_NAME': 'testserver',
+            'SERVER_PORT': '80',
+            'QUERY_STRING': query_string,
             'CONTENT_LENGTH': 0,
             'wsgi.input': payload
-        })
+        }, **extra))
         if user:
             request.user = user
         request._dont_enforce_csrf_checks = True
@@ -108,6 +119,104 @@ class TestReviewListView(TestCase):
         self.assertEqual(data.get('user'), 'john')
         self.assertEqual(Review.objects.count(), 1)
 
+    @override_settings(REVIEWS_ASYNC_INGESTION=True)
+    def test_post_review_async(self):
+        request = self._prepare_post_request(self.data, self.user_john)
+        response = self.view.dispatch(request)
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+
+        data = response.data
+        submission = ReviewSubmission.objects.get()
+
+        self.assertEqual(data.get('id'), str(submission.tracking_id))
+        self.assertEqual(data.get('status'), 'pending')
+        self.assertEqual(response['Location'], '/api/submissions/{}/'.format(submission.tracking_id))
+        self.assertEqual(submission.user, self.user_john)
+        self.assertEqual(Review.objects.count(), 0)
+
+    def test_post_review_prefer_async(self):
+        request = self._prepare_post_request(self.data, self.user_john)
+        request.META['HTTP_PREFER'] = 'respond-async'
+        response = self.view.dispatch(request)
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(ReviewSubmission.objects.count(), 1)
+
+    @override_settings(REVIEWS_ASYNC_INGESTION=True)
+    def test_post_review_async_invalid(self):
+        self.data['rating'] = 6
+        request = self._prepare_post_request(self.data, self.user_john)
+        response = self.view.dispatch(request)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(ReviewSubmission.objects.count(), 0)
+
+    def _post_with_key(self, data, key):
+        request = self._prepare_post_request(data, self.user_john)
+        request.META['HTTP_IDEMPOTENCY_KEY'] = key
+        return self.view.dispatch(request)
+
+    def test_post_review_idempotent(self):
+        response = self._post_with_key(self.data, 'key-1')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertFalse(response.has_header('Idempotent-Replayed'))
+
+        with self.assertQueryBudget(1):
+            replay = self._post_with_key(self.data, 'key-1')
+
+        self.assertEqual(replay.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(replay['Idempotent-Replayed'], 'true')
+        self.assertEqual(replay.data.get('id'), response.data.get('id'))
+        self.assertEqual(Review.objects.count(), 1)
+
+        self._post_with_key(self.data, 'key-2')
+
+        self.assertEqual(Review.objects.count(), 2)
+
+    def test_post_review_idempotent_mismatch(self):
+        self._post_with_key(self.data, 'key-1')
+        self.data['rating'] = 5
+        response = self._post_with_key(self.data, 'key-1')
+
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertEqual(Review.objects.count(), 1)
+
+    def test_post_review_idempotent_in_flight(self):
+        self._post_with_key(self.data, 'key-1')
+        IdempotencyKey.objects.update(status=IdempotencyKey.IN_FLIGHT)
+
+        response = self._post_with_key(self.data, 'key-1')
+
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response['Retry-After'], '1')
+
+        IdempotencyKey.objects.update(created_at=timezone.now() - timedelta(minutes=5))
+        response = self._post_with_key(self.data, 'key-1')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Review.objects.count(), 2)
+
+    def test_post_review_idempotent_expired(self):
+        self._post_with_key(self.data, 'key-1')
+        IdempotencyKey.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+
+        response = self._post_with_key(self.data, 'key-1')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertFalse(response.has_header('Idempotent-Replayed'))
+        self.assertEqual(Review.objects.count(), 2)
+
+    def test_post_review_idempotent_errors_replayed(self):
+        self.data['rating'] = 6
+        self._post_with_key(self.data, 'key-1')
+        response = self._post_with_key(self.data, 'key-1')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response['Idempotent-Replayed'], 'true')
+        self.assertEqual(len(response.data.get('rating')), 1)
+
     def test_post_review_long_title(self):
         self.data['title'] = 'This is a very very very very very very very very very long title'
         request = self._prepare_post_request(self.data, self.user_john)
@@ -172,7 +281,7 @@ class TestReviewListView(TestCase):
         self.assertIsInstance(self.view, APIView)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
-        data = response.data
+        data = response.data.get('results')
 
         self.assertEqual(len(data), 1)
         self.assertIsNotNone(data[0].get('id'))
@@ -184,9 +293,10 @@ class TestReviewListView(TestCase):
         self.assertIsInstance(self.view, APIView)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
-        data = response.data
+        data = response.data.get('results')
 
         self.assertEqual(len(data), 0)
+        self.assertIsNone(response.data.get('next'))
 
     def test_get_own_reviews(self):
         self.review_by_john.save()
@@ -198,7 +308,7 @@ class TestReviewListView(TestCase):
         self.assertIsInstance(self.view, APIView)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
-        data = response.data
+        data = response.data.get('results')
 
         self.assertEqual(len(data), 1)
         self.assertIsNotNone(data[0].get('id'))
@@ -212,3 +322,361 @@ class TestReviewListView(TestCase):
 
         self.assertIsInstance(self.view, APIView)
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def _create_reviews(self, user, count):
+        for i in range(count):
+            Review.objects.create(
+                title='Review {}'.format(i),
+                summary='This is a review.',
+                rating=1,
+                ip_address='127.0.0.1',
+                company='Some Company',
+                reviewer='Some Reviewer',
+                user=user,
+            )
+
+    def test_get_reviews_paginated(self):
+        self._create_reviews(self.user_john, 5)
+
+        seen = []
+        query_string = 'page_size=2'
+        while True:
+            request = self._prepare_get_request(self.user_john, query_string)
+            response = self.view.dispatch(request)
+
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertLessEqual(len(response.data.get('results')), 2)
+
+            seen.extend(review.get('id') for review in response.data.get('results'))
+            if response.data.get('next') is None:
+                break
+            query_string = urlparse(response.data.get('next')).query
+
+        expected = list(Review.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+        self.assertEqual(seen, expected)
+
+    @override_settings(REVIEWS_MAX_PAGE_SIZE=3)
+    def test_get_reviews_page_size_capped(self):
+        self._create_reviews(self.user_john, 5)
+
+        request = self._prepare_get_request(self.user_john, 'page_size=100')
+        response = self.view.dispatch(request)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data.get('results')), 3)
+        self.assertIsNotNone(response.data.get('next'))
+
+    def test_get_reviews_invalid_cursor(self):
+        request = self._prepare_get_request(self.user_john, 'cursor=not-a-cursor')
+        response = self.view.dispatch(request)
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_get_reviews_cached(self):
+        self.review_by_john.save()
+
+        request = self._prepare_get_request(self.user_john)
+        response = self.view.dispatch(request)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNotNone(response.get('ETag'))
+        self.assertIsNotNone(response.get('Last-Modified'))
+        self.assertIn('private', response.get('Cache-Control'))
+
+        with self.assertNumQueries(0):
+            request = self._prepare_get_request(self.user_john)
+            cached_response = self.view.dispatch(request)
+
+        self.assertEqual(cached_response.status_code, status.HTTP_200_OK)
+        self.assertEqual(cached_response.data, response.data)
+        self.assertEqual(cached_response['ETag'], response['ETag'])
+
+    def test_get_reviews_not_modified(self):
+        self.review_by_john.save()
+
+        request = self._prepare_get_request(self.user_john)
+        etag = self.view.dispatch(request)['ETag']
+
+        with self.assertNumQueries(0):
+            request = self._prepare_get_request(self.user_john, HTTP_IF_NONE_MATCH=etag)
+            response = self.view.dispatch(request)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_get_reviews_ignores_if_modified_since(self):
+        self.review_by_john.save()
+
+        request = self._prepare_get_request(self.user_john)
+        last_modified = self.view.dispatch(request)['Last-Modified']
+        Review.objects.create(
+            title='Another review',
+            summary='This is my second review.',
+            rating=2,
+            ip_address='127.0.0.1',
+            company='Some Company',
+            reviewer='Some Reviewer',
+            user=self.user_john,
+        )
+
+        request = self._prepare_get_request(self.user_john, HTTP_IF_MODIFIED_SINCE=last_modified)
+        response = self.view.dispatch(request)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data.get('results')), 2)
+
+    def test_get_reviews_invalidated_on_write(self):
+        self.review_by_john.save()
+
+        request = self._prepare_get_request(self.user_john)
+        etag = self.view.dispatch(request)['ETag']
+
+        request = self._prepare_post_request(self.data, self.user_john)
+        self.view.dispatch(request)
+
+        request = self._prepare_get_request(self.user_john, HTTP_IF_NONE_MATCH=etag)
+        response = self.view.dispatch(request)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(len(response.data.get('results')), 2)
+
+        self.review_by_john.delete()
+
+        request = self._prepare_get_request(self.user_john)
+        response = self.view.dispatch(request)
+
+        self.assertEqual(len(response.data.get('results')), 1)
+
+    def test_get_reviews_cache_per_user(self):
+        self.review_by_john.save()
+        self.review_by_fred.save()
+
+        request = self._prepare_get_request(self.user_john)
+        self.view.dispatch(request)
+
+        request = self._prepare_get_request(self.user_fred)
+        response = self.view.dispatch(request)
+
+        self.assertEqual(len(response.data.get('results')), 1)
+        self.assertEqual(response.data.get('results')[0].get('title'), 'Review by Fred')
+
+    def test_get_reviews_search(self):
+        self.review_by_john.save()
+        Review.objects.create(
+            title='Another one',
+            summary='Nothing to see here.',
+            rating=3,
+            ip_address='127.0.0.1',
+            company='Acme',
+            reviewer='Wile E. Coyote',
+            user=self.user_john,
+        )
+
+        for query_string, title in (('q=first', 'My review'), ('q=acm', 'Another one'), ('q=wile', 'Another one')):
+            request = self._prepare_get_request(self.user_john, query_string)
+            response = self.view.dispatch(request)
+
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+            data = response.data.get('results')
+
+            self.assertEqual(len(data), 1)
+            self.assertEqual(data[0].get('title'), title)
+
+        request = self._prepare_get_request(self.user_john, 'q=coyote')
+        response = self.view.dispatch(request)
+
+        self.assertEqual(len(response.data.get('results')), 0)
+
+    def test_get_reviews_fields(self):
+        self.review_by_john.save()
+
+        request = self._prepare_get_request(self.user_john, 'fields=title,rating')
+        response = self.view.dispatch(request)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        data = response.data.get('results')
+
+        self.assertEqual(set(data[0].keys()), {'title', 'rating'})
+        self.assertEqual(data[0].get('title'), 'My review')
+
+    @override_settings(REVIEWS_EXCERPT_LENGTH=7)
+    def test_get_reviews_excerpt(self):
+        self.review_by_john.save()
+
+        request = self._prepare_get_request(self.user_john, 'fields=id,user,excerpt')
+        response = self.view.dispatch(request)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        data = response.data.get('results')
+
+        self.assertEqual(set(data[0].keys()), {'id', 'user', 'excerpt'})
+        self.assertEqual(data[0].get('excerpt'), 'This is')
+        self.assertEqual(data[0].get('user'), 'john')
+
+    def test_get_reviews_unknown_fields(self):
+        request = self._prepare_get_request(self.user_john, 'fields=title,ip_address,bogus')
+        response = self.view.dispatch(request)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(len(response.data.get('fields')), 1)
+
+    def test_get_reviews_query_budget(self):
+        def seed(count):
+            self._create_reviews(self.user_john, count)
+            cache.clear()
+
+        def get_reviews():
+            request = self._prepare_get_request(self.user_john)
+            self.view.dispatch(request)
+
+        self.assertConstantQueries(seed, get_reviews)
+
+        cache.clear()
+        with self.assertQueryBudget(1):
+            get_reviews()
+
+    def test_get_reviews_fields_without_body(self):
+        self.review_by_john.save()
+
+        with self.assertQueryBudget(1) as counter:
+            request = self._prepare_get_request(self.user_john, 'fields=id,title')
+            response = self.view.dispatch(request)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(any('api_reviewbody' in shape for shape in counter.shapes))
+
+        cache.clear()
+        with self.assertQueryBudget(1) as counter:
+            request = self._prepare_get_request(self.user_john)
+            response = self.view.dispatch(request)
+
+        self.assertEqual(response.data.get('results')[0].get('summary'), 'This is my first review.')
+        self.assertTrue(any('api_reviewbody' in shape for shape in counter.shapes))
+
+    def test_get_reviews_batch(self):
+        self.review_by_john.save()
+        self.review_by_fred.save()
+        missing_id = self.review_by_fred.id + 100
+        query_string = 'ids={},{},{},{}'.format(
+            missing_id, self.review_by_fred.id, self.review_by_john.id, self.review_by_john.id
+        )
+
+        with self.assertQueryBudget(2):
+            request = self._prepare_get_request(self.user_john, query_string)
+            response = self.view.dispatch(request)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([review['id'] for review in response.data['results']], [self.review_by_john.id])
+        self.assertEqual(response.data['results'][0]['summary'], 'This is my first review.')
+        self.assertEqual(response.data['forbidden'], [self.review_by_fred.id])
+        self.assertEqual(response.data['missing'], [missing_id])
+
+    def test_get_reviews_batch_invalid(self):
+        request = self._prepare_get_request(self.user_john, 'ids=1,abc')
+        response = self.view.dispatch(request)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        with override_settings(REVIEWS_MAX_BATCH_LOOKUP=2):
+            request = self._prepare_get_request(self.user_john, 'ids=1,2,3')
+            response = self.view.dispatch(request)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_get_reviews_filtered(self):
+        for i in range(6):
+            Review.objects.create(
+                title='Review {}'.format(i),
+                summary='This is a review.',
+                rating=i,
+                ip_address='127.0.0.1',
+                company='Company {}'.format(i % 2),
+                reviewer='Some Reviewer',
+                user=self.user_john,
+            )
+
+        request = self._prepare_get_request(self.user_john, 'rating_min=2&rating_max=4&company=Company+0')
+        response = self.view.dispatch(request)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([review['rating'] for review in response.data['results']], [4, 2])
+
+        request = self._prepare_get_request(self.user_john, 'rating_min=abc')
+        response = self.view.dispatch(request)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_get_reviews_created_range(self):
+        self._create_reviews(self.user_john, 3)
+        old = Review.objects.order_by('id').first()
+        Review.objects.filter(id=old.id).update(created_at=timezone.now() - timedelta(days=10))
+        since = (timezone.now() - timedelta(days=1)).isoformat().replace('+', '%2B')
+
+        request = self._prepare_get_request(self.user_john, 'created_after={}'.format(since))
+        response = self.view.dispatch(request)
+
+        self.assertEqual(len(response.data['results']), 2)
+
+        request = self._prepare_get_request(self.user_john, 'created_before={}'.format(since))
+        response = self.view.dispatch(request)
+
+        self.assertEqual([review['id'] for review in response.data['results']], [old.id])
+
+    def test_get_reviews_ordered_paginated(self):
+        for rating in (3, 1, 3, 5, 1):
+            Review.objects.create(
+                title='My review',
+                summary='This is a review.',
+                rating=rating,
+                ip_address='127.0.0.1',
+                company='Some Company',
+                reviewer='Some Reviewer',
+                user=self.user_john,
+            )
+
+        for ordering, expected in (
+                ('rating', Review.objects.order_by('rating', 'created_at', 'id')),
+                ('-rating', Review.objects.order_by('-rating', '-created_at', '-id')),
+                ('created_at', Review.objects.order_by('created_at', 'id'))):
+            seen = []
+            query_string = 'page_size=2&ordering={}'.format(ordering)
+            while True:
+                request = self._prepare_get_request(self.user_john, query_string)
+                response = self.view.dispatch(request)
+                seen.extend(review.get('id') for review in response.data.get('results'))
+                if response.data.get('next') is None:
+                    break
+                query_string = urlparse(response.data.get('next')).query
+
+            self.assertEqual(seen, list(expected.values_list('id', flat=True)))
+
+    def test_get_reviews_invalid_ordering(self):
+        request = self._prepare_get_request(self.user_john, 'ordering=title')
+        response = self.view.dispatch(request)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_get_reviews_stats(self):
+        self._create_reviews(self.user_john, 2)
+        self.review_by_fred.save()
+
+        with self.assertQueryBudget(1):
+            request = self._prepare_get_request(self.user_john, 'fields=id,title')
+            response = self.view.dispatch(request)
+
+        self.assertEqual(response.data['stats'], {'review_count': 2, 'average_rating': 1.0})
+
+        request = self._prepare_get_request(self.user_john, 'rating_min=5')
+        response = self.view.dispatch(request)
+
+        self.assertEqual(response.data['results'], [])
+        self.assertEqual(response.data['stats']['review_count'], 2)
+
+        request = self._prepare_get_request(User.objects.create_user('anna', 'anna@example.com', 'anna_pwd'))
+        response = self.view.dispatch(request)
+
+        self.assertEqual(response.data['stats'], {'review_count': 0, 'average_rating': None})
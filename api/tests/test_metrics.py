@@ -0,0 +1,128 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from api import metrics
+
+
+class MetricsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            'user1',
+            'user1@example.com',
+            'user1_pwd'
+        )
+        self.client.force_login(self.user)
+        cache.clear()
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+
+        metrics.store.clear()
+        self.addCleanup(metrics.store.clear)
+        settings = override_settings(REVIEWS_METRICS_DIR=self.tmpdir, REVIEWS_METRICS_BUCKETS=(0.1, 1))
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def test_record_requests(self):
+        self.client.get('/api/reviews/')
+        self.client.get('/api/reviews/')
+        self.client.get('/api/review/999/')
+        response = self.client.get('/api/metrics/')
+        content = response.content.decode()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/plain; version=0.0.4; charset=utf-8')
+        self.assertIn('reviews_requests_total{pattern="^reviews/$",method="GET",status="200"} 2', content)
+        self.assertIn('reviews_requests_total{pattern="^review/(?P<pk>[0-9]+)/$",method="GET",status="404"} 1', content)
+        for phase in metrics.PHASES:
+            self.assertIn(
+                'reviews_request_duration_seconds_count{{pattern="^reviews/$",method="GET",'
+                'status="200",phase="{}"}} 2'.format(phase),
+                content
+            )
+        self.assertIn('phase="total",le="+Inf"} 2', content)
+
+    def test_phases(self):
+        self.client.get('/api/reviews/')
+        series = metrics.store.collect()[0][3]
+
+        self.assertGreater(series['auth']['sum'], 0)
+        self.assertGreater(series['db']['sum'], 0)
+        self.assertGreater(series['render']['sum'], 0)
+        self.assertGreaterEqual(series['total']['sum'], series['auth']['sum'] + series['render']['sum'])
+
+    def _write_process(self, pid, started):
+        with open(os.path.join(self.tmpdir, metrics.FILE_NAME.format(pid, started)), 'w') as f:
+            json.dump([['^reviews/$', 'GET', 200, {
+                phase: {'buckets': [1, 2, 0], 'sum': 1.5} for phase in metrics.PHASES
+            }]], f)
+
+    def test_merge_processes(self):
+        self.client.get('/api/reviews/')
+        self._write_process(os.getppid(), 1)
+
+        records = metrics.store.collect()
+
+        self.assertEqual(len(records), 1)
+        self.assertEqual(sum(records[0][3]['total']['buckets']), 4)
+
+    def test_fold_exited_processes(self):
+        self.client.get('/api/reviews/')
+        process = subprocess.Popen([sys.executable, '-c', ''])
+        process.wait()
+        self._write_process(process.pid, 1)
+        self._write_process(os.getppid(), 1)
+        self._write_process(os.getppid(), 2)
+
+        for i in range(2):
+            records = metrics.store.collect()
+
+            self.assertEqual(sum(records[0][3]['total']['buckets']), 10)
+
+        self.assertEqual(sorted(os.listdir(self.tmpdir)), sorted([
+            metrics.FILE_NAME.format(os.getpid(), metrics.store._started),
+            metrics.FILE_NAME.format(os.getppid(), 2),
+            metrics.EXITED_FILE,
+            metrics.LOCK_FILE,
+        ]))
+
+    def test_exited_file_not_folded_twice(self):
+        self._write_process(os.getppid(), 1)
+        self._write_process(os.getppid(), 2)
+        name = metrics.FILE_NAME.format(os.getppid(), 1)
+        with open(os.path.join(self.tmpdir, name)) as f:
+            records = json.load(f)
+        with open(os.path.join(self.tmpdir, metrics.EXITED_FILE), 'w') as f:
+            json.dump({'files': [name], 'records': records}, f)
+
+        records = metrics.store.collect()
+
+        self.assertEqual(sum(records[0][3]['total']['buckets']), 6)
+        self.assertFalse(os.path.exists(os.path.join(self.tmpdir, name)))
+
+    def test_in_process_without_directory(self):
+        with override_settings(REVIEWS_METRICS_DIR=None):
+            self.client.get('/api/reviews/')
+            records = metrics.store.collect()
+
+        self.assertEqual(sum(records[0][3]['total']['buckets']), 1)
+        self.assertEqual(os.listdir(self.tmpdir), [])
+
+    @override_settings(REVIEWS_METRICS_ALLOWED_IPS=[])
+    def test_metrics_forbidden(self):
+        response = self.client.get('/api/metrics/')
+
+        self.assertEqual(response.status_code, 403)
+
+        self.user.is_staff = True
+        self.user.save()
+        response = self.client.get('/api/metrics/')
+
+        self.assertEqual(response.status_code, 200)
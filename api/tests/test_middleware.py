@@ -0,0 +1,94 @@
+import json
+import os
+import shutil
+import tempfile
+
+from django.contrib.auth.models import User
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+
+from api import profiling
+from api.middleware import QueryInstrumentationMiddleware
+from api.models import Review
+
+
+class QueryInstrumentationMiddlewareTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            'user1',
+            'user1@example.com',
+            'user1_pwd'
+        )
+        self.factory = RequestFactory()
+
+    def _get_response(self, request):
+        for i in range(3):
+            Review.objects.filter(pk=i).exists()
+        return HttpResponse()
+
+    @override_settings(DEBUG=True)
+    def test_headers_in_debug(self):
+        middleware = QueryInstrumentationMiddleware(self._get_response)
+        response = middleware(self.factory.get('/api/reviews/'))
+
+        self.assertEqual(response['X-Query-Count'], '3')
+        self.assertIsNotNone(response['X-Query-Time'])
+        self.assertEqual(response['X-Query-Repeated'], '0')
+
+    @override_settings(DEBUG=True, REVIEWS_REPEATED_QUERY_THRESHOLD=3)
+    def test_repeated_queries(self):
+        middleware = QueryInstrumentationMiddleware(self._get_response)
+
+        with self.assertLogs('api.queries', level='WARNING') as logs:
+            response = middleware(self.factory.get('/api/reviews/'))
+
+        self.assertEqual(response['X-Query-Repeated'], '1')
+        self.assertIn('repeated 3 times', logs.output[0])
+
+    def test_no_headers_without_debug(self):
+        middleware = QueryInstrumentationMiddleware(self._get_response)
+        request = self.factory.get('/api/reviews/')
+        response = middleware(request)
+
+        self.assertFalse(response.has_header('X-Query-Count'))
+        self.assertEqual(request.query_counter.count, 3)
+
+
+class ProfilingMiddlewareTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            'user1',
+            'user1@example.com',
+            'user1_pwd'
+        )
+        self.client.force_login(self.user)
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+
+    def test_profile_with_signed_header(self):
+        with self.settings(REVIEWS_PROFILE_DIR=self.tmpdir):
+            response = self.client.get('/api/reviews/', HTTP_X_PROFILE=profiling.make_token())
+
+        name = response['X-Profile-Id']
+        with open(os.path.join(self.tmpdir, name + '.json')) as f:
+            tags = json.load(f)
+
+        self.assertTrue(os.path.exists(os.path.join(self.tmpdir, name + '.prof')))
+        self.assertEqual(tags['view'], 'api.views.ReviewListView')
+        self.assertEqual(tags['status'], 200)
+        self.assertGreater(tags['queries'], 0)
+
+    def test_no_profile_with_bad_header(self):
+        with self.settings(REVIEWS_PROFILE_DIR=self.tmpdir):
+            response = self.client.get('/api/reviews/', HTTP_X_PROFILE='forged')
+
+        self.assertFalse(response.has_header('X-Profile-Id'))
+        self.assertEqual(os.listdir(self.tmpdir), [])
+
+    def test_sampled_profiles_rotate(self):
+        with self.settings(REVIEWS_PROFILE_DIR=self.tmpdir, REVIEWS_PROFILE_SAMPLE_RATE=1.0, REVIEWS_PROFILE_KEEP=2):
+            names = [self.client.get('/api/reviews/')['X-Profile-Id'] for _ in range(3)]
+
+        self.assertEqual(sorted(os.listdir(self.tmpdir)), sorted(
+            name + extension for name in names[1:] for extension in ('.json', '.prof')
+        ))
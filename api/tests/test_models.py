@@ -1,9 +1,13 @@
+import json
 import re
+from datetime import timedelta
 
 from django.contrib.auth.models import User
 from django.test import TestCase
+from django.utils import timezone
 
-from api.models import Review
+from api.archive import archive_reviews
+from api.models import ArchivedReview, CompanyRating, Review, ReviewBody, ReviewSubmission, UserReviewStats
 
 
 class ReviewModelTests(TestCase):
@@ -41,6 +45,44 @@ class ReviewModelTests(TestCase):
         self.assertIsNotNone(iso_re.match(str(self.review.created_at)))
         self.assertEqual(Review.objects.count(), 1)
 
+    def test_save_summary_in_body(self):
+        self.review.save()
+
+        self.assertEqual(ReviewBody.objects.get(review=self.review).summary, 'This is my first review.')
+
+        self.review.summary = 'Updated summary.'
+        self.review.save()
+
+        self.assertEqual(ReviewBody.objects.count(), 1)
+        self.assertEqual(Review.objects.get().summary, 'Updated summary.')
+
+    def test_summary_select_related(self):
+        self.review.save()
+        review = Review.objects.select_related('body').get()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(review.summary, 'This is my first review.')
+
+    def test_create_many(self):
+        reviews = Review.objects.create_many([
+            Review(
+                title='Review {}'.format(i),
+                summary='Summary {}'.format(i),
+                rating=i,
+                ip_address='127.0.0.1',
+                company='Some Company',
+                reviewer='Some Reviewer',
+                user=self.user,
+            )
+            for i in range(3)
+        ])
+
+        self.assertEqual(Review.objects.count(), 3)
+        self.assertEqual(ReviewBody.objects.count(), 3)
+        self.assertEqual(Review.objects.get(title='Review 2').summary, 'Summary 2')
+        self.assertEqual(CompanyRating.objects.get(company='Some Company').review_count, 3)
+        self.assertTrue(all(review.id for review in reviews))
+
     def test_model_str(self):
         self.review.save()
         self.assertEquals(str(self.review), 'My review')
@@ -70,3 +112,216 @@ class ReviewModelTests(TestCase):
         self.review.ip_address='127,0,0,1'
         with self.assertRaises(Exception):
             self.review.save()
+
+
+class CompanyRatingModelTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            'user1',
+            'user1@example.com',
+            'user1_pwd'
+        )
+
+    def _create_review(self, rating, company='Some Company'):
+        return Review.objects.create(
+            title='My review',
+            summary='This is my first review.',
+            rating=rating,
+            ip_address='127.0.0.1',
+            company=company,
+            reviewer='Some Reviewer',
+            user=self.user,
+        )
+
+    def test_create_reviews(self):
+        self._create_review(1)
+        self._create_review(4)
+        self._create_review(4)
+
+        company_rating = CompanyRating.objects.get(company='Some Company')
+
+        self.assertEqual(company_rating.review_count, 3)
+        self.assertEqual(company_rating.rating_sum, 9)
+        self.assertEqual(company_rating.average_rating, 3)
+        self.assertEqual(company_rating.distribution, {'0': 0, '1': 1, '2': 0, '3': 0, '4': 2, '5': 0})
+
+    def test_update_review(self):
+        review = self._create_review(1)
+        review.rating = 5
+        review.company = 'Other Company'
+        review.save()
+
+        old = CompanyRating.objects.get(company='Some Company')
+        new = CompanyRating.objects.get(company='Other Company')
+
+        self.assertEqual(old.review_count, 0)
+        self.assertEqual(old.rating_1, 0)
+        self.assertIsNone(old.average_rating)
+        self.assertEqual(new.review_count, 1)
+        self.assertEqual(new.rating_5, 1)
+
+    def test_delete_review(self):
+        self._create_review(2)
+        self._create_review(3).delete()
+
+        company_rating = CompanyRating.objects.get(company='Some Company')
+
+        self.assertEqual(company_rating.review_count, 1)
+        self.assertEqual(company_rating.rating_sum, 2)
+        self.assertEqual(company_rating.rating_3, 0)
+
+    def test_bulk_delete(self):
+        self._create_review(2)
+        self._create_review(3)
+        self._create_review(3, company='Other Company')
+
+        deleted = Review.objects.bulk_delete(Review.objects.filter(rating=3))
+
+        self.assertEqual(deleted, 2)
+        self.assertEqual(Review.objects.count(), 1)
+        self.assertEqual(ReviewBody.objects.count(), 1)
+        self.assertEqual(CompanyRating.objects.get(company='Some Company').review_count, 1)
+        self.assertEqual(CompanyRating.objects.get(company='Some Company').rating_3, 0)
+        self.assertEqual(CompanyRating.objects.get(company='Other Company').review_count, 0)
+
+    def test_rebuild(self):
+        self._create_review(2)
+        self._create_review(5, company='Other Company')
+        CompanyRating.objects.update(review_count=100)
+
+        self.assertEqual(CompanyRating.objects.rebuild(), 2)
+        self.assertEqual(CompanyRating.objects.get(company='Some Company').review_count, 1)
+        self.assertEqual(CompanyRating.objects.get(company='Other Company').rating_5, 1)
+
+    def test_rebuild_includes_archived_reviews(self):
+        review = self._create_review(4)
+        archive_reviews(timezone.now() + timedelta(days=1), 10)
+        self._create_review(2)
+
+        self.assertEqual(CompanyRating.objects.rebuild(), 1)
+
+        company_rating = CompanyRating.objects.get(company='Some Company')
+
+        self.assertEqual(company_rating.review_count, 2)
+        self.assertEqual(company_rating.rating_sum, 6)
+        self.assertEqual(company_rating.rating_4, 1)
+        self.assertTrue(ArchivedReview.objects.filter(id=review.id).exists())
+
+
+class UserReviewStatsModelTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            'user1',
+            'user1@example.com',
+            'user1_pwd'
+        )
+        self.other = User.objects.create_user(
+            'user2',
+            'user2@example.com',
+            'user2_pwd'
+        )
+
+    def _review(self, rating, user=None):
+        return Review(
+            title='My review',
+            summary='This is my first review.',
+            rating=rating,
+            ip_address='127.0.0.1',
+            company='Some Company',
+            reviewer='Some Reviewer',
+            user=user or self.user,
+        )
+
+    def test_save_and_delete(self):
+        review = self._review(2)
+        review.save()
+        self._review(4).save()
+
+        stats = UserReviewStats.objects.get(user=self.user)
+
+        self.assertEqual(stats.review_count, 2)
+        self.assertEqual(stats.average_rating, 3)
+
+        review.rating = 5
+        review.user = self.other
+        review.save()
+        review.refresh_from_db()
+
+        self.assertEqual(UserReviewStats.objects.get(user=self.user).rating_sum, 4)
+        self.assertEqual(UserReviewStats.objects.get(user=self.other).rating_sum, 5)
+
+        review.delete()
+
+        self.assertEqual(UserReviewStats.objects.get(user=self.other).review_count, 0)
+        self.assertIsNone(UserReviewStats.objects.get(user=self.other).average_rating)
+
+    def test_create_many_and_bulk_delete(self):
+        Review.objects.create_many([self._review(1), self._review(3), self._review(5, self.other)])
+
+        self.assertEqual(UserReviewStats.objects.get(user=self.user).rating_sum, 4)
+        self.assertEqual(UserReviewStats.objects.get(user=self.other).review_count, 1)
+
+        Review.objects.bulk_delete(Review.objects.filter(rating__gte=3))
+        stats = UserReviewStats.objects.get(user=self.user)
+
+        self.assertEqual((stats.review_count, stats.rating_sum), (1, 1))
+        self.assertEqual(UserReviewStats.objects.get(user=self.other).review_count, 0)
+
+
+class ReviewSubmissionModelTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            'user1',
+            'user1@example.com',
+            'user1_pwd'
+        )
+
+        self.payload = json.dumps({
+            'title': 'My review',
+            'summary': 'This is my first review.',
+            'rating': 1,
+            'ip_address': '127.0.0.1',
+            'company': 'Some Company',
+            'reviewer': 'Some Reviewer',
+        })
+
+    def test_drain(self):
+        for i in range(3):
+            ReviewSubmission.objects.create(user=self.user, payload=self.payload)
+
+        self.assertEqual(ReviewSubmission.objects.drain(2), 2)
+        self.assertEqual(Review.objects.count(), 2)
+        self.assertEqual(ReviewSubmission.objects.filter(status=ReviewSubmission.PENDING).count(), 1)
+
+        self.assertEqual(ReviewSubmission.objects.drain(2), 1)
+        self.assertEqual(ReviewSubmission.objects.drain(2), 0)
+
+        for submission in ReviewSubmission.objects.all():
+            self.assertEqual(submission.status, ReviewSubmission.DONE)
+            self.assertIsNotNone(submission.processed_at)
+            self.assertEqual(submission.review.user, self.user)
+            self.assertEqual(submission.review.title, 'My review')
+
+        self.assertEqual(CompanyRating.objects.get(company='Some Company').review_count, 3)
+
+    def test_drain_failed(self):
+        ReviewSubmission.objects.create(user=self.user, payload=self.payload)
+        bad_field = ReviewSubmission.objects.create(user=self.user, payload='{"bogus": 1}')
+        null_title = ReviewSubmission.objects.create(
+            user=self.user,
+            payload=json.dumps(dict(json.loads(self.payload), title=None))
+        )
+        ReviewSubmission.objects.create(user=self.user, payload=self.payload)
+
+        self.assertEqual(ReviewSubmission.objects.drain(10), 4)
+        self.assertEqual(ReviewSubmission.objects.drain(10), 0)
+        self.assertEqual(Review.objects.count(), 2)
+        self.assertEqual(ReviewSubmission.objects.filter(status=ReviewSubmission.DONE).count(), 2)
+        self.assertEqual(CompanyRating.objects.get(company='Some Company').review_count, 2)
+
+        for submission in (bad_field, null_title):
+            submission.refresh_from_db()
+            self.assertEqual(submission.status, ReviewSubmission.FAILED)
+            self.assertIsNotNone(submission.processed_at)
+            self.assertIsNone(submission.review)
+            self.assertNotEqual(submission.error, '')
@@ -0,0 +1,158 @@
+import gzip
+import json
+import uuid
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from unittest import mock, skipIf
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from api.middleware import brotli
+from api.models import Review
+from api.renderers import FastJSONRenderer, MessagePackRenderer, msgpack, orjson
+
+
+class RendererTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            'user1',
+            'user1@example.com',
+            'user1_pwd'
+        )
+        self.client.force_login(self.user)
+        cache.clear()
+
+        Review.objects.create_many([
+            Review(
+                title='Review {}'.format(i),
+                summary='This is review number {}.'.format(i),
+                rating=i % 6,
+                ip_address='127.0.0.1',
+                company='Some Company',
+                reviewer='Some Reviewer',
+                user=self.user,
+            )
+            for i in range(20)
+        ])
+
+    def test_json(self):
+        response = self.client.get('/api/reviews/')
+
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertEqual(len(json.loads(response.content.decode())['results']), 20)
+
+    @skipIf(orjson is None, 'orjson is not installed')
+    def test_fast_json_matches_json(self):
+        data = {
+            'expires_at': timezone.now() + timedelta(microseconds=1),
+            'naive': datetime(2018, 9, 6, 16, 30, 10, 223029),
+            'date': date(2018, 9, 6),
+            'time': time(16, 30, 10, 5),
+            'id': uuid.uuid4(),
+            'amount': Decimal('1.50'),
+        }
+
+        self.assertEqual(
+            json.loads(FastJSONRenderer().render(data).decode()),
+            json.loads(JSONRenderer().render(data).decode())
+        )
+
+    @skipIf(msgpack is None, 'msgpack is not installed')
+    def test_msgpack(self):
+        response = self.client.get('/api/reviews/', HTTP_ACCEPT='application/msgpack')
+        data = msgpack.unpackb(response.content, raw=False)
+
+        self.assertEqual(response['Content-Type'], 'application/msgpack')
+        self.assertEqual(len(data['results']), 20)
+        self.assertEqual(data['results'][0]['title'], 'Review 19')
+        self.assertIn('Accept', response['Vary'])
+
+    @skipIf(msgpack is None, 'msgpack is not installed')
+    def test_msgpack_create(self):
+        response = self.client.post('/api/reviews/', msgpack.packb({
+            'title': 'My review',
+            'summary': 'This is my first review.',
+            'rating': 4,
+            'company': 'Some Company',
+            'reviewer': 'Some Reviewer',
+        }), content_type='application/msgpack')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.user.reviews.filter(rating=4).count(), 4)
+
+    def test_msgpack_unavailable(self):
+        with mock.patch.object(MessagePackRenderer, 'available', False):
+            response = self.client.get('/api/reviews/', HTTP_ACCEPT='application/msgpack')
+
+        self.assertEqual(response.status_code, 406)
+
+    @skipIf(msgpack is None, 'msgpack is not installed')
+    def test_etag_per_format(self):
+        json_response = self.client.get('/api/reviews/')
+        msgpack_response = self.client.get('/api/reviews/', HTTP_ACCEPT='application/msgpack')
+
+        self.assertNotEqual(json_response['ETag'], msgpack_response['ETag'])
+
+
+class CompressionMiddlewareTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            'user1',
+            'user1@example.com',
+            'user1_pwd'
+        )
+        self.client.force_login(self.user)
+        cache.clear()
+
+        Review.objects.create_many([
+            Review(
+                title='Review {}'.format(i),
+                summary='This is review number {}.'.format(i),
+                rating=i % 6,
+                ip_address='127.0.0.1',
+                company='Some Company',
+                reviewer='Some Reviewer',
+                user=self.user,
+            )
+            for i in range(20)
+        ])
+
+    @override_settings(REVIEWS_COMPRESSION_MIN_SIZE=1024)
+    def test_gzip(self):
+        response = self.client.get('/api/reviews/', HTTP_ACCEPT_ENCODING='gzip')
+        data = json.loads(gzip.decompress(response.content).decode())
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(len(data['results']), 20)
+        self.assertTrue(response['ETag'].startswith('W/'))
+
+        response = self.client.get(
+            '/api/reviews/', HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=response['ETag']
+        )
+
+        self.assertEqual(response.status_code, 304)
+
+    @skipIf(brotli is None, 'brotli is not installed')
+    def test_brotli(self):
+        response = self.client.get('/api/reviews/', HTTP_ACCEPT_ENCODING='gzip, deflate, br')
+        data = json.loads(brotli.decompress(response.content).decode())
+
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(len(data['results']), 20)
+
+    def test_streaming_gzip(self):
+        response = self.client.get('/api/reviews/export/', HTTP_ACCEPT_ENCODING='gzip')
+        content = gzip.decompress(b''.join(response.streaming_content))
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(len(json.loads(content.decode())), 20)
+
+    @override_settings(REVIEWS_COMPRESSION_MIN_SIZE=1024 * 1024)
+    def test_below_threshold(self):
+        response = self.client.get('/api/reviews/', HTTP_ACCEPT_ENCODING='gzip')
+
+        self.assertFalse(response.has_header('Content-Encoding'))
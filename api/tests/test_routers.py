@@ -0,0 +1,192 @@
+import json
+from unittest import mock, skipUnless
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TransactionTestCase, override_settings
+
+from api import routers
+from api.checks import check_replica_cache
+from api.middleware import ReplicaPinningMiddleware
+from api.models import AuthToken, Review
+
+
+@override_settings(REVIEWS_READ_REPLICAS=['replica1', 'replica2'])
+class ReplicaRouterTests(SimpleTestCase):
+    def setUp(self):
+        self.user = User(id=1, username='user1')
+        self.factory = RequestFactory()
+        self.router = routers.ReplicaRouter()
+        routers.replicas = routers.ReplicaPool()
+        cache.clear()
+
+    def tearDown(self):
+        routers.clear_request()
+
+    def _read_db(self, method='get', user=None):
+        request = getattr(self.factory, method)('/api/reviews/')
+        request.user = user or AnonymousUser()
+        routers.set_request(request)
+        return self.router.db_for_read(Review)
+
+    @mock.patch.object(routers.ReplicaPool, 'check', return_value=True)
+    def test_round_robin(self, check):
+        aliases = [self._read_db(user=self.user) for i in range(4)]
+
+        self.assertEqual(sorted(aliases), ['replica1', 'replica1', 'replica2', 'replica2'])
+        self.assertNotEqual(aliases[0], aliases[1])
+        self.assertEqual(self.router.db_for_write(Review), 'default')
+
+    @mock.patch.object(routers.ReplicaPool, 'check', return_value=True)
+    def test_unsafe_method_uses_primary(self, check):
+        self.assertEqual(self._read_db('post', self.user), 'default')
+
+    @mock.patch.object(routers.ReplicaPool, 'check', return_value=True)
+    def test_outside_request_uses_primary(self, check):
+        routers.clear_request()
+
+        self.assertEqual(self.router.db_for_read(Review), 'default')
+
+    @mock.patch.object(routers.ReplicaPool, 'check', return_value=True)
+    def test_pinned_user_uses_primary(self, check):
+        routers.pin_user(self.user.id)
+
+        self.assertEqual(self._read_db(user=self.user), 'default')
+        self.assertIn(self._read_db(user=User(id=2, username='user2')), ('replica1', 'replica2'))
+
+    def test_unhealthy_replica_ejected(self):
+        with mock.patch.object(routers.ReplicaPool, 'check', side_effect=lambda alias: alias == 'replica2'):
+            aliases = {self._read_db(user=self.user) for i in range(4)}
+
+        self.assertEqual(aliases, {'replica2'})
+
+    @mock.patch.object(routers.ReplicaPool, 'check', return_value=False)
+    def test_all_replicas_unhealthy(self, check):
+        self.assertEqual(self._read_db(user=self.user), 'default')
+
+    @override_settings(REVIEWS_READ_REPLICAS=[])
+    def test_no_replicas(self):
+        self.assertEqual(self._read_db(user=self.user), 'default')
+
+    @mock.patch.object(routers.ReplicaPool, 'check', return_value=True)
+    def test_auth_models_use_primary(self, check):
+        self._read_db(user=self.user)
+
+        self.assertEqual(self.router.db_for_read(AuthToken), 'default')
+        self.assertEqual(self.router.db_for_read(User), 'default')
+
+    @mock.patch.object(routers.ReplicaPool, 'check', return_value=True)
+    def test_stream_in_request(self, check):
+        request = self.factory.get('/api/reviews/export/')
+        request.user = self.user
+        content = routers.stream_in_request(request, (self.router.db_for_read(Review) for i in range(2)))
+
+        self.assertEqual(self.router.db_for_read(Review), 'default')
+        self.assertEqual(sorted(content), ['replica1', 'replica2'])
+        self.assertEqual(self.router.db_for_read(Review), 'default')
+
+    def test_allow_migrate(self):
+        self.assertTrue(self.router.allow_migrate('default', 'api'))
+        self.assertFalse(self.router.allow_migrate('replica1', 'api'))
+
+
+class ReplicaPinningMiddlewareTests(SimpleTestCase):
+    def setUp(self):
+        self.user = User(id=1, username='user1')
+        self.factory = RequestFactory()
+        cache.clear()
+
+    def _call(self, request, status=200):
+        request.user = self.user
+        middleware = ReplicaPinningMiddleware(lambda request: HttpResponse(status=status))
+        return middleware(request)
+
+    def test_pin_after_write(self):
+        response = self._call(self.factory.post('/api/reviews/'), status=201)
+
+        self.assertTrue(cache.get(routers.PIN_KEY.format(self.user.id)))
+        self.assertIn(routers.PIN_COOKIE, response.cookies)
+
+    def test_pin_cookie_without_shared_cache(self):
+        response = self._call(self.factory.post('/api/reviews/'), status=201)
+        cache.clear()
+        request = self.factory.get('/api/reviews/')
+        request.COOKIES[routers.PIN_COOKIE] = response.cookies[routers.PIN_COOKIE].value
+
+        self.assertTrue(routers.is_pinned(request, self.user.id))
+        self.assertFalse(routers.is_pinned(request, 2))
+        self.assertFalse(routers.is_pinned(self.factory.get('/api/reviews/'), self.user.id))
+
+    def test_no_pin_after_read_or_failed_write(self):
+        self._call(self.factory.get('/api/reviews/'))
+        response = self._call(self.factory.post('/api/reviews/'), status=400)
+
+        self.assertIsNone(cache.get(routers.PIN_KEY.format(self.user.id)))
+        self.assertNotIn(routers.PIN_COOKIE, response.cookies)
+
+
+class ReplicaCacheCheckTests(SimpleTestCase):
+    @override_settings(REVIEWS_READ_REPLICAS=['replica1'])
+    def test_local_cache_rejected(self):
+        self.assertEqual([error.id for error in check_replica_cache(None)], ['api.E001'])
+
+    @override_settings(
+        REVIEWS_READ_REPLICAS=['replica1'],
+        CACHES={'default': {'BACKEND': 'django.core.cache.backends.memcached.MemcachedCache'}}
+    )
+    def test_shared_cache_accepted(self):
+        self.assertEqual(check_replica_cache(None), [])
+
+
+@skipUnless('replica' in settings.DATABASES, 'needs a "replica" database alias')
+class ReplicaDatabaseTests(TransactionTestCase):
+    multi_db = True
+
+    def setUp(self):
+        replicas = override_settings(REVIEWS_READ_REPLICAS=['replica'])
+        replicas.enable()
+        self.addCleanup(replicas.disable)
+        self.user = User.objects.create_user('user1', 'user1@example.com', 'user1_pwd')
+        token, key = AuthToken.issue(self.user)
+        self.auth = 'Token ' + key
+        User.objects.db_manager('replica').create(id=self.user.id, username='user1')
+        Review.objects.using('replica').bulk_create([
+            Review(
+                title='Replica review',
+                summary='This review only exists on the replica.',
+                rating=3,
+                ip_address='127.0.0.1',
+                company='Some Company',
+                reviewer='Some Reviewer',
+                user_id=self.user.id,
+            )
+        ])
+        routers.replicas = routers.ReplicaPool()
+        cache.clear()
+
+    def _titles(self):
+        response = self.client.get('/api/reviews/', HTTP_AUTHORIZATION=self.auth)
+        self.assertEqual(response.status_code, 200)
+        return [review['title'] for review in response.json()['results']]
+
+    def test_reads_follow_replica_until_write(self):
+        self.assertEqual(self._titles(), ['Replica review'])
+
+        response = self.client.post('/api/reviews/', {
+            'title': 'My review',
+            'summary': 'This is my first review.',
+            'rating': 1,
+            'company': 'Some Company',
+            'reviewer': 'Some Reviewer',
+        }, content_type='application/json', HTTP_AUTHORIZATION=self.auth)
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self._titles(), ['My review'])
+
+    def test_export_reads_replica(self):
+        response = self.client.get('/api/reviews/export/', HTTP_AUTHORIZATION=self.auth)
+        reviews = json.loads(b''.join(response.streaming_content).decode())
+
+        self.assertEqual([review['title'] for review in reviews], ['Replica review'])
@@ -51,6 +51,21 @@ class ReviewSerializerTests(TestCase):
         self.assertEqual(data.get('reviewer'), 'Some Reviewer')
         self.assertEqual(data.get('user'), 'user1')
 
+    def test_serialize_model_fields(self):
+        self.review.save()
+        serializer = ReviewSerializer(self.review, fields=['id', 'title'])
+
+        data = serializer.data
+
+        self.assertEqual(set(data.keys()), {'id', 'title'})
+
+    def test_readable_fields(self):
+        fields = ReviewSerializer.readable_fields()
+
+        self.assertIn('summary', fields)
+        self.assertIn('excerpt', fields)
+        self.assertNotIn('ip_address', fields)
+
     def test_deserialize_data(self):
         serializer = ReviewSerializer(data=self.data)
 
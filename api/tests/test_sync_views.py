@@ -0,0 +1,126 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.handlers.wsgi import WSGIRequest
+from django.test import TestCase, override_settings
+from django.test.client import FakePayload
+from django.utils import timezone
+from rest_framework import status
+
+from api import sync
+from api.models import Review
+from api.tests.utils import QueryBudgetMixin
+from api.views import ReviewSyncView
+
+
+@override_settings(REVIEWS_SYNC_SETTLE_SECONDS=0)
+class TestReviewSyncView(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        self.user_john = User.objects.create_user(
+            'john',
+            'john@example.com',
+            'john_pwd'
+        )
+
+        self.user_fred = User.objects.create_user(
+            'fred',
+            'fred@example.com',
+            'fred_pwd'
+        )
+
+        self.view = ReviewSyncView()
+
+    def _create_review(self, user, title='My review'):
+        return Review.objects.create(
+            title=title,
+            summary='This is my first review.',
+            rating=1,
+            ip_address='127.0.0.1',
+            company='Some Company',
+            reviewer='Some Reviewer',
+            user=user,
+        )
+
+    def _prepare_get_request(self, user=None, query_string=''):
+        payload = FakePayload('')
+        request = WSGIRequest({
+            'REQUEST_METHOD': 'GET',
+            'QUERY_STRING': query_string,
+            'CONTENT_LENGTH': 0,
+            'wsgi.input': payload
+        })
+        if user:
+            request.user = user
+        request._dont_enforce_csrf_checks = True
+        return request
+
+    def _sync(self, token=None, limit=None):
+        query_string = '&'.join(
+            '{}={}'.format(name, value) for name, value in (('token', token), ('limit', limit)) if value
+        )
+        return self.view.dispatch(self._prepare_get_request(self.user_john, query_string))
+
+    def test_sync_changes(self):
+        first = self._create_review(self.user_john, 'First')
+        second = self._create_review(self.user_john, 'Second')
+        self._create_review(self.user_fred)
+
+        response = self._sync()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([review['id'] for review in response.data['changed']], [first.id, second.id])
+        self.assertEqual(response.data['deleted'], [])
+        self.assertFalse(response.data['more'])
+
+        token = response.data['token']
+        first.title = 'First, edited'
+        first.save()
+        second_id = second.id
+        second.delete()
+        third = self._create_review(self.user_john, 'Third')
+
+        with self.assertQueryBudget(2):
+            response = self._sync(token)
+
+        self.assertEqual([review['id'] for review in response.data['changed']], [first.id, third.id])
+        self.assertEqual(response.data['changed'][0]['title'], 'First, edited')
+        self.assertEqual(response.data['deleted'], [second_id])
+
+        response = self._sync(response.data['token'])
+
+        self.assertEqual(response.data['changed'], [])
+        self.assertEqual(response.data['deleted'], [])
+
+    def test_sync_paginated(self):
+        reviews = [self._create_review(self.user_john) for _ in range(3)]
+
+        response = self._sync(limit=2)
+
+        self.assertTrue(response.data['more'])
+        self.assertEqual(len(response.data['changed']), 2)
+
+        response = self._sync(response.data['token'], limit=2)
+
+        self.assertFalse(response.data['more'])
+        self.assertEqual([review['id'] for review in response.data['changed']], [reviews[2].id])
+
+    def test_sync_bulk_delete(self):
+        reviews = [self._create_review(self.user_john) for _ in range(2)]
+        token = self._sync().data['token']
+
+        Review.objects.bulk_delete(Review.objects.filter(id=reviews[0].id))
+        response = self._sync(token)
+
+        self.assertEqual(response.data['deleted'], [reviews[0].id])
+
+    def test_invalid_token(self):
+        response = self._sync('not-a-token')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(REVIEWS_SYNC_TOMBSTONE_TTL=60)
+    def test_expired_token(self):
+        old = timezone.now() - timedelta(seconds=120)
+        response = self._sync(sync.encode_token((old, 0), (old, 0)))
+
+        self.assertEqual(response.status_code, status.HTTP_410_GONE)
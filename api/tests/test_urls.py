@@ -1,9 +1,13 @@
+import json
+
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.test import Client
 from django.test import TestCase
 from rest_framework import status
 
-from api.models import Review
+from api.authentication import token_cache
+from api.models import AuthToken, Review, ReviewSubmission
 
 
 class TestUrls(TestCase):
@@ -27,6 +31,8 @@ class TestUrls(TestCase):
 
         self.client = Client()
 
+        cache.clear()
+
     def test_post_review_url(self):
         data = {
             'title': 'My review',
@@ -77,12 +83,107 @@ class TestUrls(TestCase):
 
         data = response.json()
 
-        self.assertEqual(len(data), 1)
+        self.assertEqual(len(data.get('results')), 1)
 
     def test_get_reviews_url_anon_user(self):
         response = self.client.get('/api/reviews/')
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
 
+    def test_export_reviews_url(self):
+        self.client.login(username='john', password='john_pwd')
+        response = self.client.get('/api/reviews/export/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        data = json.loads(b''.join(response.streaming_content).decode('utf-8'))
+
+        self.assertEqual(len(data), 1)
+
+    def test_issue_token_url(self):
+        self.client.login(username='john', password='john_pwd')
+        response = self.client.post('/api/tokens/')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        data = response.json()
+
+        self.assertIsNotNone(data.get('token'))
+        self.assertIsNotNone(data.get('expires_at'))
+        self.assertEqual(AuthToken.objects.filter(user=self.user_john).count(), 1)
+
+    def test_token_auth_url(self):
+        token, key = AuthToken.issue(self.user_john)
+        response = self.client.get(
+            '/api/reviews/',
+            HTTP_AUTHORIZATION='Token {}'.format(key)
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.json().get('results')), 1)
+
+    def test_revoke_token_url(self):
+        token, key = AuthToken.issue(self.user_john)
+        auth = 'Token {}'.format(key)
+
+        response = self.client.delete('/api/tokens/', HTTP_AUTHORIZATION=auth)
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertIsNone(token_cache.get(token.key_digest))
+
+        response = self.client.get('/api/reviews/', HTTP_AUTHORIZATION=auth)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_company_stats_url(self):
+        self.client.login(username='john', password='john_pwd')
+        response = self.client.get('/api/companies/Some Company/stats/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        data = response.json()
+
+        self.assertEqual(data.get('company'), 'Some Company')
+        self.assertEqual(data.get('review_count'), 1)
+        self.assertEqual(data.get('average_rating'), 1.0)
+        self.assertEqual(data.get('distribution').get('1'), 1)
+
+    def test_company_stats_url_not_found(self):
+        self.client.login(username='john', password='john_pwd')
+        response = self.client.get('/api/companies/Unknown/stats/')
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_submission_url(self):
+        submission = ReviewSubmission.objects.create(user=self.user_john, payload='{}')
+
+        self.client.login(username='john', password='john_pwd')
+        response = self.client.get('/api/submissions/{}/'.format(submission.tracking_id))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        data = response.json()
+
+        self.assertEqual(data.get('id'), str(submission.tracking_id))
+        self.assertEqual(data.get('status'), 'pending')
+        self.assertIsNone(data.get('review'))
+
+    def test_submission_url_forbidden(self):
+        fred = User.objects.create_user('fred', 'fred@example.com', 'fred_pwd')
+        submission = ReviewSubmission.objects.create(user=fred, payload='{}')
+
+        self.client.login(username='john', password='john_pwd')
+        response = self.client.get('/api/submissions/{}/'.format(submission.tracking_id))
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_submission_url_not_found(self):
+        self.client.login(username='john', password='john_pwd')
+        response = self.client.get('/api/submissions/00000000-0000-0000-0000-000000000000/')
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        response = self.client.get('/api/submissions/abc/')
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
     def test_get_review_url(self):
         self.client.login(username='john', password='john_pwd')
         response = self.client.get('/api/review/{}/'.format(self.review_by_john.id))
@@ -0,0 +1,28 @@
+from contextlib import contextmanager
+
+from api.instrumentation import QueryCounter
+
+
+class QueryBudgetMixin:
+    @contextmanager
+    def assertQueryBudget(self, budget):
+        with QueryCounter() as counter:
+            yield counter
+        self.assertLessEqual(
+            counter.count, budget,
+            '{} queries executed, budget was {}:\n{}'.format(
+                counter.count, budget, '\n'.join(counter.shapes)
+            )
+        )
+
+    def assertConstantQueries(self, seed, action, sizes=(1, 10)):
+        counts = []
+        for size in sizes:
+            seed(size)
+            with QueryCounter() as counter:
+                action()
+            counts.append(counter.count)
+        self.assertEqual(
+            len(set(counts)), 1,
+            'Query count grows with data size: {}'.format(dict(zip(sizes, counts)))
+        )
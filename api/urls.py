@@ -4,5 +4,15 @@ from api import views
 
 urlpatterns = [
     url(r'^reviews/$', views.ReviewListView.as_view()),
+    url(r'^reviews/export/$', views.ReviewExportView.as_view()),
+    url(r'^reviews/bulk/$', views.ReviewBulkCreateView.as_view()),
+    url(r'^reviews/sync/$', views.ReviewSyncView.as_view()),
+    url(r'^companies/(?P<company>[^/]+)/stats/$', views.CompanyRatingView.as_view()),
+    url(
+        r'^submissions/(?P<tracking_id>[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12})/$',
+        views.ReviewSubmissionView.as_view()
+    ),
+    url(r'^tokens/$', views.AuthTokenView.as_view()),
     url(r'^review/(?P<pk>[0-9]+)/$', views.ReviewDetailView.as_view()),
+    url(r'^metrics/$', views.MetricsView.as_view()),
 ]
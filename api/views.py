@@ -1,38 +1,333 @@
-from django.http import Http404
+import json
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.functions import Substr
+from django.http import Http404, HttpResponse, StreamingHttpResponse
 from django.shortcuts import render
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
 from rest_framework import status
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.exceptions import ValidationError
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.permissions import BasePermission, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from api.models import Review
-from api.serializers import ReviewSerializer
+from api import idempotency, metrics, routers, sync
+from api.authentication import token_cache
+from api.cache import (
+    bump_list_version, get_list_page, get_list_version, list_etag,
+    list_version_timestamp, set_list_page
+)
+from api.filters import ReviewFilter
+from api.models import (
+    ArchivedReview, AuthToken, CompanyRating, Review, ReviewSubmission, UserReviewStats
+)
+from api.pagination import ReviewCursorPagination
+from api.search import search_reviews
+from api.serializers import (
+    CompanyRatingSerializer, ReviewSerializer, ReviewSubmissionSerializer, UserReviewStatsSerializer
+)
 
 
-class ReviewListView(APIView):
+class ReviewListView(metrics.MetricsMixin, APIView):
     permission_classes = (IsAuthenticated,)
 
     def get(self, request, *args, **kwargs):
-        serializer = ReviewSerializer(request.user.reviews.all(), many=True)
-        return Response(serializer.data)
+        if 'ids' in request.query_params:
+            return Response(self._get_batch(request))
+
+        version = get_list_version(request.user.id)
+        etag = list_etag(version, request.build_absolute_uri(), request.accepted_media_type)
+        last_modified = list_version_timestamp(version)
+
+        response = get_conditional_response(request, quote_etag(etag))
+        if response is None:
+            data = get_list_page(request.user.id, etag)
+            if data is None:
+                data = self._get_page(request)
+                set_list_page(request.user.id, etag, data)
+            response = Response(data)
+
+        response['ETag'] = quote_etag(etag)
+        response['Last-Modified'] = http_date(last_modified)
+        patch_cache_control(response, private=True)
+        patch_vary_headers(response, ('Accept',))
+        return response
+
+    def _get_page(self, request):
+        filterset = ReviewFilter(request.query_params, queryset=request.user.reviews.all())
+        if not filterset.is_valid():
+            raise ValidationError(filterset.errors)
+        queryset = filterset.qs
+        if 'q' in request.query_params:
+            queryset = search_reviews(queryset, request.query_params['q'])
+        fields = self._get_fields(request)
+        if fields is None:
+            queryset = queryset.select_related('body')
+        else:
+            queryset = self._select_fields(queryset, fields)
+        queryset = queryset.select_related('user__review_stats')
+        paginator = ReviewCursorPagination()
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        serializer = ReviewSerializer(page, many=True, fields=fields)
+        data = paginator.get_paginated_response(serializer.data).data
+        data['stats'] = UserReviewStatsSerializer(self._get_stats(request, page)).data
+        return data
+
+    def _get_stats(self, request, page):
+        if page:
+            try:
+                return page[0].user.review_stats
+            except UserReviewStats.DoesNotExist:
+                return UserReviewStats(user=request.user)
+        return UserReviewStats.objects.filter(user=request.user).first() or UserReviewStats(user=request.user)
+
+    def _get_batch(self, request):
+        try:
+            ids = [int(pk) for pk in request.query_params['ids'].split(',') if pk]
+        except ValueError:
+            raise ValidationError({'ids': ['Expected a comma separated list of review ids.']})
+        ids = list(OrderedDict.fromkeys(ids))
+        if len(ids) > settings.REVIEWS_MAX_BATCH_LOOKUP:
+            raise ValidationError({'ids': ['No more than {} ids may be requested at once.'.format(
+                settings.REVIEWS_MAX_BATCH_LOOKUP
+            )]})
+
+        reviews = {review.id: review for review in Review.objects.select_related('user', 'body').filter(id__in=ids)}
+        missing = [pk for pk in ids if pk not in reviews]
+        if missing:
+            reviews.update(
+                (review.id, review) for review in ArchivedReview.objects.select_related('user').filter(id__in=missing)
+            )
+
+        found = [reviews[pk] for pk in ids if pk in reviews and reviews[pk].user_id == request.user.id]
+        return OrderedDict([
+            ('results', ReviewSerializer(found, many=True).data),
+            ('forbidden', [pk for pk in ids if pk in reviews and reviews[pk].user_id != request.user.id]),
+            ('missing', [pk for pk in ids if pk not in reviews]),
+        ])
+
+    def _get_fields(self, request):
+        if 'fields' not in request.query_params:
+            return None
+        fields = [name for name in request.query_params['fields'].split(',') if name]
+        unknown = set(fields) - set(ReviewSerializer.readable_fields())
+        if unknown:
+            raise ValidationError({'fields': ['Unknown field(s): {}'.format(', '.join(sorted(unknown)))]})
+        return fields
+
+    def _select_fields(self, queryset, fields):
+        columns = {field.name for field in Review._meta.concrete_fields} & set(fields)
+        if 'summary' in fields:
+            queryset = queryset.select_related('body')
+            columns.add('body__summary')
+        queryset = queryset.only('id', 'created_at', 'rating', 'user', *columns)
+        if 'excerpt' in fields:
+            queryset = queryset.annotate(excerpt=Substr('body__summary', 1, settings.REVIEWS_EXCERPT_LENGTH))
+        return queryset
 
     def post(self, request, *args, **kwargs):
+        key = request.META.get('HTTP_IDEMPOTENCY_KEY')
+        if not key:
+            return self._create(request)
+
+        record, response = idempotency.begin(request.user, key, idempotency.fingerprint(request.data))
+        if response is not None:
+            return response
+        try:
+            response = self._create(request)
+        except Exception:
+            idempotency.abort(record)
+            raise
+        idempotency.finish(record, response)
+        return response
+
+    def _create(self, request):
         data = request.data
         data['ip_address'] = request.META.get('REMOTE_ADDR')
         serializer = ReviewSerializer(data=data)
-        if serializer.is_valid():
-            serializer.save(user=request.user)
-            return Response(serializer.data, status.HTTP_201_CREATED)
-        return Response(serializer.errors, status.HTTP_400_BAD_REQUEST)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status.HTTP_400_BAD_REQUEST)
+        if self._is_async(request):
+            return self._enqueue(request, serializer.validated_data)
+        serializer.save(user=request.user)
+        return Response(serializer.data, status.HTTP_201_CREATED)
+
+    def _is_async(self, request):
+        prefer = request.META.get('HTTP_PREFER', '')
+        return settings.REVIEWS_ASYNC_INGESTION or 'respond-async' in prefer
+
+    def _enqueue(self, request, validated_data):
+        submission = ReviewSubmission.objects.create(
+            user=request.user,
+            payload=json.dumps(validated_data, cls=JSONEncoder)
+        )
+        serializer = ReviewSubmissionSerializer(submission)
+        return Response(serializer.data, status.HTTP_202_ACCEPTED, headers={
+            'Location': '/api/submissions/{}/'.format(submission.tracking_id)
+        })
 
 
-class ReviewDetailView(APIView):
+class ReviewBulkCreateView(metrics.MetricsMixin, APIView):
+    permission_classes = (IsAuthenticated,)
+
+    def post(self, request, *args, **kwargs):
+        data = request.data
+        if not isinstance(data, list):
+            return Response(
+                {'non_field_errors': ['Expected a list of reviews.']},
+                status.HTTP_400_BAD_REQUEST
+            )
+        if len(data) > settings.REVIEWS_MAX_BATCH_SIZE:
+            return Response(
+                {'non_field_errors': ['Batch may not contain more than {} reviews.'.format(
+                    settings.REVIEWS_MAX_BATCH_SIZE
+                )]},
+                status.HTTP_400_BAD_REQUEST
+            )
+
+        ip_address = request.META.get('REMOTE_ADDR')
+        for item in data:
+            if isinstance(item, dict):
+                item['ip_address'] = ip_address
+
+        serializer = ReviewSerializer(data=data, many=True)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status.HTTP_400_BAD_REQUEST)
+
+        reviews = [Review(user=request.user, **item) for item in serializer.validated_data]
+        with transaction.atomic():
+            reviews = Review.objects.create_many(reviews)
+        bump_list_version(request.user.id)
+        return Response(ReviewSerializer(reviews, many=True).data, status.HTTP_201_CREATED)
+
+
+class ReviewSyncView(metrics.MetricsMixin, APIView):
+    permission_classes = (IsAuthenticated,)
+
     def get(self, request, *args, **kwargs):
+        token = request.query_params.get('token')
+        if token:
+            try:
+                position = sync.decode_token(token)
+            except ValueError as e:
+                return Response({'detail': str(e)}, status.HTTP_400_BAD_REQUEST)
+            if sync.is_expired(position[1]):
+                return Response(
+                    {'detail': 'Sync token has expired, sync again without a token.'},
+                    status.HTTP_410_GONE
+                )
+
+        limit = settings.REVIEWS_SYNC_PAGE_SIZE
         try:
-            review = Review.objects.get(pk=kwargs['pk'])
-            if request.user != review.user:
-                return Response({}, status.HTTP_403_FORBIDDEN)
-        except Review.DoesNotExist:
+            limit = max(1, min(int(request.query_params['limit']), limit))
+        except (KeyError, ValueError):
+            pass
+        return Response(sync.changes_since(request.user, token, limit))
+
+
+class AuthTokenView(metrics.MetricsMixin, APIView):
+    permission_classes = (IsAuthenticated,)
+
+    def post(self, request, *args, **kwargs):
+        token, key = AuthToken.issue(request.user)
+        return Response({'token': key, 'expires_at': token.expires_at}, status.HTTP_201_CREATED)
+
+    def delete(self, request, *args, **kwargs):
+        if not isinstance(request.auth, AuthToken):
+            return Response(
+                {'detail': 'Only token authenticated requests can revoke a token.'},
+                status.HTTP_400_BAD_REQUEST
+            )
+        token_cache.discard(request.auth.key_digest)
+        request.auth.delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class CompanyRatingView(metrics.MetricsMixin, APIView):
+    permission_classes = (IsAuthenticated,)
+
+    def get(self, request, *args, **kwargs):
+        try:
+            company_rating = CompanyRating.objects.get(company=kwargs['company'])
+        except CompanyRating.DoesNotExist:
             raise Http404
+        serializer = CompanyRatingSerializer(company_rating)
+        return Response(serializer.data)
+
+
+class ReviewSubmissionView(metrics.MetricsMixin, APIView):
+    permission_classes = (IsAuthenticated,)
+
+    def get(self, request, *args, **kwargs):
+        try:
+            submission = ReviewSubmission.objects.get(tracking_id=kwargs['tracking_id'])
+        except ReviewSubmission.DoesNotExist:
+            raise Http404
+        if submission.user_id != request.user.id:
+            return Response({}, status.HTTP_403_FORBIDDEN)
+        serializer = ReviewSubmissionSerializer(submission)
+        return Response(serializer.data)
+
+
+class ReviewDetailView(metrics.MetricsMixin, APIView):
+    def get(self, request, *args, **kwargs):
+        try:
+            review = Review.objects.select_related('user', 'body').get(pk=kwargs['pk'])
+        except Review.DoesNotExist:
+            try:
+                review = ArchivedReview.objects.select_related('user').get(pk=kwargs['pk'])
+            except ArchivedReview.DoesNotExist:
+                raise Http404
+        if request.user != review.user:
+            return Response({}, status.HTTP_403_FORBIDDEN)
         serializer = ReviewSerializer(review)
         return Response(serializer.data)
+
+
+class ReviewExportView(metrics.MetricsMixin, APIView):
+    permission_classes = (IsAuthenticated,)
+
+    def get(self, request, *args, **kwargs):
+        reviews = request.user.reviews.select_related('body').order_by('id').iterator(
+            chunk_size=settings.REVIEWS_EXPORT_CHUNK_SIZE
+        )
+        serializer = ReviewSerializer()
+        rows = (
+            json.dumps(serializer.to_representation(review), cls=JSONEncoder)
+            for review in reviews
+        )
+        if request.query_params.get('ndjson'):
+            content = ('{}\n'.format(row) for row in rows)
+            return StreamingHttpResponse(
+                routers.stream_in_request(request, content), content_type='application/x-ndjson'
+            )
+        return StreamingHttpResponse(
+            routers.stream_in_request(request, self._json_array(rows)), content_type='application/json'
+        )
+
+    def _json_array(self, rows):
+        yield '['
+        for i, row in enumerate(rows):
+            yield ',' + row if i else row
+        yield ']'
+
+
+class IsMetricsClient(BasePermission):
+    def has_permission(self, request, view):
+        if request.user and request.user.is_staff:
+            return True
+        return request.META.get('REMOTE_ADDR') in settings.REVIEWS_METRICS_ALLOWED_IPS
+
+
+class MetricsView(metrics.MetricsMixin, APIView):
+    permission_classes = (IsMetricsClient,)
+
+    def get(self, request, *args, **kwargs):
+        return HttpResponse(
+            metrics.render_prometheus(metrics.store.collect()),
+            content_type='text/plain; version=0.0.4; charset=utf-8'
+        )
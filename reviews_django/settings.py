@@ -13,11 +13,16 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.middleware.CompressionMiddleware',
+    'api.middleware.QueryInstrumentationMiddleware',
+    'api.middleware.MetricsMiddleware',
+    'api.middleware.ProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'api.middleware.ReplicaPinningMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -42,6 +47,8 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'reviews_django.wsgi.application'
 
+DATABASE_ROUTERS = ['api.routers.ReplicaRouter']
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -69,6 +76,97 @@ USE_TZ = True
 
 STATIC_URL = '/static/'
 
+REVIEWS_PAGE_SIZE = 50
+
+REVIEWS_MAX_PAGE_SIZE = 500
+
+REVIEWS_EXCERPT_LENGTH = 200
+
+REVIEWS_ADMIN_EXACT_COUNT_THRESHOLD = 10000
+
+REVIEWS_COMPRESSION_MIN_SIZE = 1024
+
+REVIEWS_GZIP_LEVEL = 6
+
+REVIEWS_BROTLI_QUALITY = 4
+
+REVIEWS_EXPORT_CHUNK_SIZE = 2000
+
+REVIEWS_MAX_BATCH_SIZE = 1000
+
+REVIEWS_MAX_BATCH_LOOKUP = 100
+
+REVIEWS_SYNC_PAGE_SIZE = 500
+
+REVIEWS_SYNC_SETTLE_SECONDS = 2
+
+REVIEWS_SYNC_TOMBSTONE_TTL = 60 * 60 * 24 * 30
+
+REVIEWS_ASYNC_INGESTION = False
+
+REVIEWS_INGESTION_BATCH_SIZE = 500
+
+REVIEWS_IDEMPOTENCY_TTL = 60 * 60 * 24
+
+REVIEWS_IDEMPOTENCY_LOCK_TIMEOUT = 30
+
+REVIEWS_ARCHIVE_AFTER_DAYS = 365
+
+REVIEWS_ARCHIVE_RETENTION_MONTHS = None
+
+REVIEWS_TOKEN_LIFETIME = 60 * 60 * 24 * 7
+
+REVIEWS_TOKEN_CACHE_TTL = 60
+
+REVIEWS_TOKEN_CACHE_SIZE = 10000
+
+REVIEWS_LIST_CACHE_TIMEOUT = 300
+
+REVIEWS_REPEATED_QUERY_THRESHOLD = 5
+
+REVIEWS_PROFILE_SAMPLE_RATE = 0.0
+
+REVIEWS_PROFILE_TOKEN_MAX_AGE = 60 * 60
+
+REVIEWS_PROFILE_DIR = os.path.join(BASE_DIR, 'profiles')
+
+REVIEWS_PROFILE_KEEP = 1000
+
+REVIEWS_METRICS_DIR = None
+
+REVIEWS_METRICS_FLUSH_INTERVAL = 1
+
+REVIEWS_METRICS_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+REVIEWS_METRICS_ALLOWED_IPS = ['127.0.0.1']
+
+REVIEWS_READ_REPLICAS = []
+
+REVIEWS_PRIMARY_PIN_SECONDS = 10
+
+REVIEWS_REPLICA_HEALTH_INTERVAL = 5
+
+REVIEWS_REPLICA_EJECT_SECONDS = 30
+
+REST_FRAMEWORK = {
+    'DEFAULT_AUTHENTICATION_CLASSES': (
+        'rest_framework.authentication.SessionAuthentication',
+        'api.authentication.ExpiringTokenAuthentication',
+        'rest_framework.authentication.BasicAuthentication',
+    ),
+    'DEFAULT_RENDERER_CLASSES': (
+        'api.renderers.FastJSONRenderer',
+        'api.renderers.MessagePackRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'api.parsers.FastJSONParser',
+        'api.parsers.MessagePackParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
+    'DEFAULT_CONTENT_NEGOTIATION_CLASS': 'api.negotiation.ContentNegotiation',
+}
+
 if 'TRAVIS' in os.environ:
     SECRET_KEY = os.environ['SECRET_KEY']
 
@@ -82,7 +180,16 @@ if 'TRAVIS' in os.environ:
             'NAME': os.environ['DATABASE_NAME'],
             'USER': os.environ['DATABASE_USER'],
             'PASSWORD': os.environ['DATABASE_PASSWORD'],
-        }
+        },
+        'replica': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ['DATABASE_NAME'],
+            'USER': os.environ['DATABASE_USER'],
+            'PASSWORD': os.environ['DATABASE_PASSWORD'],
+            'TEST': {
+                'NAME': 'test_{}_replica'.format(os.environ['DATABASE_NAME']),
+            },
+        },
     }
 
 try: